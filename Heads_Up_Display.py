@@ -7,6 +7,7 @@
 #############################################################
 
 from settings import HEIGHT
+from text_cache import text_cache
 
 class HeadsUpDisplay:
     def __init__(self, screen, font, position=(10, 10), level_position=(10, 50), sugar_position=(10, 90)):
@@ -33,29 +34,30 @@ class HeadsUpDisplay:
         self.sugar_grains = sugar_grains
 
     def draw_level(self):
-        """Draw the current level on the screen."""
+        """Draw the current level on the screen. Returns the area drawn."""
         level_text = f"Level: {self.level}"
-        level_surface = self.font.render(level_text, True, (255, 255, 255))
-        self.screen.blit(level_surface, self.level_position)
+        level_surface = text_cache.render(self.font, level_text, (255, 255, 255))
+        return self.screen.blit(level_surface, self.level_position)
 
     def draw_sugar_count(self):
-        """Draw the sugar count on the screen."""
+        """Draw the sugar count on the screen. Returns the area drawn."""
         remaining_sugar = self.total_sugar - len(self.sugar_grains)
         sugar_text = f"Total Sugar: {self.total_sugar} | Remaining Sugar: {remaining_sugar}"
-        sugar_surface = self.font.render(sugar_text, True, (255, 255, 255))
-        self.screen.blit(sugar_surface, self.sugar_position)
+        sugar_surface = text_cache.render(self.font, sugar_text, (255, 255, 255))
+        return self.screen.blit(sugar_surface, self.sugar_position)
 
     def draw_bucket_info(self, buckets, moving_buckets):
-            """Draw the bucket information on the screen."""
+            """Draw the bucket information on the screen. Returns the area drawn."""
             if self.level != 3 :
                 moving_buckets.clear()
         
             bucket_text = f"Buckets: {len(buckets)} | Moving Buckets: {len(moving_buckets)}"
-            bucket_surface = self.font.render(bucket_text, True, (255, 255, 255))
-            self.screen.blit(bucket_surface, self.position)
+            bucket_surface = text_cache.render(self.font, bucket_text, (255, 255, 255))
+            return self.screen.blit(bucket_surface, self.position)
 
     def draw_bucket_counters(self, buckets):
-        """Draw the sugar grain counters for each bucket, showing a fraction of collected vs needed sugar."""
+        """Draw the sugar grain counters for each bucket, showing a fraction of collected vs needed sugar. Returns the areas drawn."""
+        rects = []
         for i, bucket in enumerate(buckets):
             # Assume bucket.x and bucket.y represent the position of each bucket
             bucket_x = bucket.bucketx  # Horizontal position of the bucket
@@ -69,7 +71,7 @@ class HeadsUpDisplay:
             bucket_text = f"{collected_count}/{total_needed_sugar}"
 
             # Render the text
-            bucket_surface = self.font.render(bucket_text, True, (255, 255, 255))
+            bucket_surface = text_cache.render(self.font, bucket_text, (255, 255, 255))
 
             # Position the text inside the bucket (center it horizontally and vertically)
             bucket_width = bucket.width  # Example width of the bucket
@@ -81,13 +83,15 @@ class HeadsUpDisplay:
             )
 
             # Draw the text on the screen
-            self.screen.blit(bucket_surface, bucket_text_position)
+            rects.append(self.screen.blit(bucket_surface, bucket_text_position))
+        return rects
 
 
 
     
     def draw_moving_bucket_counter(self,moving_buckets):
-        """Draw the bucket information on the screen."""
+        """Draw the bucket information on the screen. Returns the areas drawn."""
+        rects = []
 
         # Display information about each moving bucket
         for i, moving_bucket in enumerate(moving_buckets):
@@ -98,10 +102,11 @@ class HeadsUpDisplay:
             # Use the moving bucket's x, y attributes for position
             moving_bucket_text = f"Moving Bucket {collected_count}/{total_needed_sugar}"
             moving_bucket_position = (moving_bucket.x - 65, HEIGHT -  moving_bucket.y + 30)  # Display above the bucket
-            moving_bucket_surface = self.font.render(moving_bucket_text, True, (255, 255, 255))
+            moving_bucket_surface = text_cache.render(self.font, moving_bucket_text, (255, 255, 255))
 
             # Draw the text near the moving bucket's position
-            self.screen.blit(moving_bucket_surface, moving_bucket_position)
+            rects.append(self.screen.blit(moving_bucket_surface, moving_bucket_position))
+        return rects
 
 
 
@@ -114,12 +119,15 @@ class HeadsUpDisplay:
         Args:
             buckets: List of static buckets.
             moving_buckets: List of moving buckets.
+
+        Returns:
+            List of the screen areas drawn, for dirty-rectangle updates.
         """
-        self.draw_level()
-        self.draw_sugar_count()
-        self.draw_bucket_info(buckets, moving_buckets)  # Corrected to use moving_buckets
-        self.draw_bucket_counters(buckets)
-        self.draw_moving_bucket_counter(moving_buckets)
+        rects = [self.draw_level(), self.draw_sugar_count()]
+        rects.append(self.draw_bucket_info(buckets, moving_buckets))  # Corrected to use moving_buckets
+        rects.extend(self.draw_bucket_counters(buckets))
+        rects.extend(self.draw_moving_bucket_counter(moving_buckets))
+        return rects
 
 
 
@@ -0,0 +1,169 @@
+#############################################################
+# Module Name: Sugar Pop Batch Evaluator Module
+# Project: Sugar Pop Program
+# Date: Oct 18, 2026
+# By: Eyasu Smieja
+# Description: Runs scripted headless games on every core to rate a level
+#############################################################
+
+import argparse
+import csv
+import json
+import os
+import random
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+
+# Headless runs need no window or sound card. Set before pygame is imported.
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+# Steps between line points. Game only adds a line vertex when its step counter is a multiple of 10.
+LINE_POINT_STEPS = 10
+
+# Steps between bucket fill samples
+SAMPLE_EVERY = 60
+
+
+def scripted_events(inputs, rng=None, jitter=0):
+    """
+    Turn scenario inputs into the (step, event) pairs Game.run_headless() takes.
+
+    An input is a dict with a 'step' and one action:
+        "line": [[x, y], ...]  draw a line through the points, in screen pixels (y down, like the mouse)
+        "gravity": "up" | "down"
+        "move_bucket": "left" | "right", with an optional "hold": steps the key is held (default 5, 10 px)
+        "restart": true
+
+    :param inputs: List of input dicts.
+    :param rng: random.Random used for jitter.
+    :param jitter: Move each line point by up to this many pixels.
+    :return: List of (step, pygame event) pairs.
+    """
+    import pygame as pg
+
+    keys = {
+        ('gravity', 'up'): pg.K_UP, ('gravity', 'down'): pg.K_DOWN,
+        ('move_bucket', 'left'): pg.K_LEFT, ('move_bucket', 'right'): pg.K_RIGHT,
+    }
+    events = []
+    for item in inputs:
+        step = item['step']
+        if 'line' in item:
+            # Start on a step the game accepts vertices on
+            step = -(-step // LINE_POINT_STEPS) * LINE_POINT_STEPS
+            points = [(x + rng.uniform(-jitter, jitter), y + rng.uniform(-jitter, jitter)) if jitter else (x, y)
+                      for x, y in item['line']]
+            points = [(int(x), int(y)) for x, y in points]
+            events.append((step, pg.event.Event(pg.MOUSEBUTTONDOWN, pos=points[0], button=1)))
+            for i, point in enumerate(points[1:], 1):
+                events.append((step + i * LINE_POINT_STEPS, pg.event.Event(pg.MOUSEMOTION, pos=point, rel=(0, 0), buttons=(1, 0, 0))))
+            events.append((step + len(points) * LINE_POINT_STEPS, pg.event.Event(pg.MOUSEBUTTONUP, pos=points[-1], button=1)))
+        elif 'restart' in item:
+            events.append((step, pg.event.Event(pg.KEYDOWN, key=pg.K_r)))
+        elif 'gravity' in item:
+            events.append((step, pg.event.Event(pg.KEYDOWN, key=keys['gravity', item['gravity']])))
+        else:
+            key = keys['move_bucket', item['move_bucket']]
+            events.append((step, pg.event.Event(pg.KEYDOWN, key=key)))
+            events.append((step + item.get('hold', 5), pg.event.Event(pg.KEYUP, key=key)))
+    return events
+
+
+def run_one(job):
+    """
+    Simulate one run in a pool process.
+
+    :param job: (scenario name, run index, level, steps, inputs, jitter).
+    :return: Dict of the run's statistics.
+    """
+    name, run, level, steps, inputs, jitter = job
+    import main  # Imported here so each pool process sets up pygame once
+
+    events = scripted_events(inputs, random.Random(run), jitter)
+    result = main.run_headless(level, steps, events, seed=run, sample_every=SAMPLE_EVERY)
+    result.update(scenario=name, run=run)
+    return result
+
+
+def load_scenarios(path):
+    """
+    Read scenarios from a JSON file: a list of {"name": ..., "inputs": [...]}
+    (see scripted_events). Without a file, one scenario with no input is used.
+    """
+    if not path:
+        return [{'name': 'no input', 'inputs': []}]
+    with open(path) as f:
+        return json.load(f)
+
+
+def summarize(results):
+    """
+    Print completion rate, time to complete, grains lost and mean bucket fill
+    curves for each scenario.
+
+    :param results: Run statistics from run_one().
+    """
+    by_scenario = {}
+    for result in results:
+        by_scenario.setdefault(result['scenario'], []).append(result)
+
+    print(f"{'scenario':<24}{'runs':>6}{'complete':>10}{'t50 (s)':>10}{'t max (s)':>11}{'lost':>8}")
+    for name, runs in by_scenario.items():
+        done = [r['completed_step'] * r['sim_time'] / r['steps'] for r in runs if r['completed_step']]
+        lost = statistics.mean(r['grains'] - r['grains_collected'] for r in runs)
+        t50 = f"{statistics.median(done):.1f}" if done else '-'
+        t_max = f"{max(done):.1f}" if done else '-'
+        print(f"{name:<24}{len(runs):>6}{len(done) / len(runs):>10.0%}{t50:>10}{t_max:>11}{lost:>8.1f}")
+
+    for name, runs in by_scenario.items():
+        print(f"\n{name}: mean grains in each bucket by time (s)")
+        samples = {}
+        for r in runs:
+            for step, counts in r['fill_curves']:
+                samples.setdefault(step, []).append(counts)
+        for step in sorted(samples)[::5]:
+            means = [statistics.mean(column) for column in zip(*samples[step])]
+            seconds = step * runs[0]['sim_time'] / runs[0]['steps']
+            print(f"  {seconds:6.1f}  " + "  ".join(f"{mean:6.1f}" for mean in means))
+
+
+def write_curves(path, results):
+    """Write every run's bucket fill samples to a CSV file."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(('scenario', 'run', 'step', 'bucket', 'count'))
+        for r in results:
+            for step, counts in r['fill_curves']:
+                for bucket, count in enumerate(counts):
+                    writer.writerow((r['scenario'], r['run'], step, bucket, count))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rate a Sugar Pop level with many scripted headless runs")
+    parser.add_argument('level', type=int, help="level number to simulate")
+    parser.add_argument('scenarios', nargs='?', help="JSON file of scripted inputs (see scripted_events)")
+    parser.add_argument('--runs', type=int, default=100, help="runs per scenario")
+    parser.add_argument('--steps', type=int, default=120 * 60, help="physics steps per run")
+    parser.add_argument('--jitter', type=float, default=5, help="random offset of line points, in pixels")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="processes to run in parallel")
+    parser.add_argument('--curves', help="also write the bucket fill samples to this CSV file")
+    args = parser.parse_args()
+
+    scenarios = load_scenarios(args.scenarios)
+    # Levels and assets are found relative to the game directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    jobs = [(scenario['name'], run, args.level, args.steps, scenario['inputs'], args.jitter)
+            for scenario in scenarios for run in range(args.runs)]
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(run_one, jobs, chunksize=max(1, len(jobs) // (4 * args.workers))))
+
+    summarize(results)
+    if args.curves:
+        write_curves(args.curves, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#############################################################
+# Module Name: Sugar Pop Benchmarks Module
+# Project: Sugar Pop Program
+# Date: Oct 18, 2026
+# By: Eyasu Smieja
+# Description: Performance benchmarks for the sugar pop game
+#############################################################
+
+import argparse
+import gc
+import time
+import tracemalloc
+import pymunk
+from settings import MAX_TIME_STEP, SLEEP_TIME_THRESHOLD, IDLE_SPEED_THRESHOLD
+from sugar_grain import Sugar_Grain
+
+
+def grain_memory(counts=(1000, 10000, 50000)):
+    """
+    Measure the Python heap used per sugar grain with tracemalloc.
+
+    :param counts: Grain counts to measure.
+    """
+    print("grains   bytes/grain   total KiB")
+    for count in counts:
+        space = pymunk.Space()
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        grains = [Sugar_Grain(space, (i % 1000) + 10, (i // 1000) + 10) for i in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        used = after - before
+        print(f"{count:6d}   {used / count:11.1f}   {used / 1024:9.0f}")
+        del grains, space
+
+
+def pile_space(count, sleeping):
+    """
+    Pour count grains into a 300 px wide box and let them come to rest.
+
+    :param count: Number of grains in the pile.
+    :param sleeping: Configure sleeping like the game does.
+    :return: The Pymunk space.
+    """
+    space = pymunk.Space()
+    space.gravity = (0, -4.8)
+    space.iterations = 30
+    if sleeping:
+        space.sleep_time_threshold = SLEEP_TIME_THRESHOLD
+        space.idle_speed_threshold = IDLE_SPEED_THRESHOLD
+    for a, b in (((10, 1), (10, 20)), ((10, 1), (20, 1)), ((20, 1), (20, 20))):
+        space.add(pymunk.Segment(space.static_body, a, b, 0.2))
+
+    # Drop the grains in rows of 100, like a spout, and let each row land
+    for start in range(0, count, 100):
+        for i in range(start, min(start + 100, count)):
+            Sugar_Grain(space, 305 + (i % 100) * 2.9, 500 + (i // 100 % 2) * 3)
+        for _ in range(120):
+            space.step(MAX_TIME_STEP)
+    for _ in range(600):
+        space.step(MAX_TIME_STEP)
+    return space
+
+
+def pile_step_time(counts=(250, 500, 1000, 2000), steps=240):
+    """
+    Measure the physics step time of a resting pile with and without sleeping.
+
+    :param counts: Pile sizes to measure.
+    :param steps: Steps timed per measurement.
+    """
+    print("grains   awake ms/step   asleep ms/step   sleeping bodies")
+    for count in counts:
+        times = []
+        for sleeping in (False, True):
+            space = pile_space(count, sleeping)
+            start = time.perf_counter()
+            for _ in range(steps):
+                space.step(MAX_TIME_STEP)
+            times.append((time.perf_counter() - start) / steps * 1000)
+        asleep = sum(body.is_sleeping for body in space.bodies)
+        print(f"{count:6d}   {times[0]:13.3f}   {times[1]:14.3f}   {asleep:15d}")
+
+
+BENCHMARKS = {
+    'grain_memory': grain_memory,
+    'pile_step_time': pile_step_time,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sugar Pop benchmarks")
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS), help="benchmark to run")
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark]()
+
+
+if __name__ == '__main__':
+    main()
@@ -8,21 +8,73 @@
 
 import pygame as pg
 import pymunk
-from settings import SCALE, HEIGHT, WIDTH
-from music import Music 
-from math import sqrt
+from settings import SCALE, HEIGHT, WIDTH, BOX_COLLISION_TYPE, GRAIN_COLLISION_TYPE
+from music import play_sound_effect
+from collisions import on_collision, ordered_shapes
+
+# Distance between grains settled in a bucket's pile, a little over a grain's 2 px
+PILE_SPACING = 2.5 / SCALE
+
+BUCKET_COLOR = (144, 238, 144)  # Light green
+
+
+def to_pygame(p):
+    """Convert a point from Pymunk to Pygame screen coordinates."""
+    return int(p[0] * SCALE), int(HEIGHT - p[1] * SCALE)
+
+
+def add_collection_handler(space, grains):
+    """
+    Route grains entering any bucket sensor to that bucket.
+    Works for Bucket and MovingBucket, which both tag their sensor shape.
+
+    :param space: The Pymunk space the buckets live in.
+    :param grains: The GrainSystem, used when a full bucket explodes.
+    """
+    on_collision(space, GRAIN_COLLISION_TYPE, BOX_COLLISION_TYPE,
+                 begin=_grain_entered_bucket, data=grains)
+
+
+def _grain_entered_bucket(arbiter, space, grains):
+    grain_shape, sensor = ordered_shapes(arbiter, GRAIN_COLLISION_TYPE)
+    sensor.bucket.grain_entered(grain_shape.grain, grains)
+
+
+def make_sensor(body, left, right, bottom, top, owner):
+    """
+    Create the sensor shape covering a bucket's interior.
+
+    :param body: The body the sensor is attached to.
+    :param left, right, bottom, top: Interior bounds in Pymunk coordinates.
+    :param owner: The bucket that collects grains entering the sensor.
+    """
+    sensor = pymunk.Poly(body, [(left, bottom), (right, bottom), (right, top), (left, top)])
+    sensor.sensor = True  # Reports overlaps but never pushes grains
+    sensor.collision_type = BOX_COLLISION_TYPE
+    sensor.bucket = owner
+    return sensor
+
 
 class Bucket:
-    def __init__(self, space, x, y, width, height, needed_sugar):
+    def __init__(self, space, x, y, width, height, needed_sugar, attach=True):
+        """
+        Build a bucket with an open top and a sensor over its interior.
+
+        :param space: The Pymunk space the bucket belongs to.
+        :param x, y: Center of the bucket in Pygame units.
+        :param width, height: Size of the bucket in Pygame units.
+        :param needed_sugar: Grains to collect before the bucket explodes.
+        :param attach: Add the bucket to the space now. Pass False to build it
+            off the main thread and call attach() later.
+        """
 
-        self.music = Music()
         self.space = space
         self.width = width / SCALE
         self.height = height / SCALE
         self.count = 0  # Counter for collected sugar grains
         self.needed_sugar = needed_sugar
-        self.collected_sugar = []
-        self.grain_constraints = []
+        self.collected_sugar = set()  # Every grain counted so far
+        self.pile = []  # Collected grains settled out of the physics, in collection order
         wall_thickness = 0.2  # Thickness of the walls in physics units
         self.bucketx = x
         self.buckety = y
@@ -38,7 +90,6 @@ class Bucket:
         self.left_wall = pymunk.Segment(space.static_body, left_wall_start, left_wall_end, wall_thickness)
         self.left_wall.friction = 0.5
         self.left_wall.elasticity = 0.5
-        space.add(self.left_wall)
 
         # Right wall
         right_wall_start = (x_pymunk + self.width / 2, y_pymunk - self.height / 2)
@@ -46,7 +97,6 @@ class Bucket:
         self.right_wall = pymunk.Segment(space.static_body, right_wall_start, right_wall_end, wall_thickness)
         self.right_wall.friction = 0.5
         self.right_wall.elasticity = 0.5
-        space.add(self.right_wall)
 
         # Bottom wall
         bottom_wall_start = (x_pymunk - self.width / 2, y_pymunk - self.height / 2)
@@ -54,9 +104,24 @@ class Bucket:
         self.bottom_wall = pymunk.Segment(space.static_body, bottom_wall_start, bottom_wall_end, wall_thickness)
         self.bottom_wall.friction = 0.5
         self.bottom_wall.elasticity = 0.5
-        space.add(self.bottom_wall)
+
+        # Interior sensor, grains entering it are collected
+        self.sensor = make_sensor(space.static_body,
+                                  x_pymunk - self.width / 2, x_pymunk + self.width / 2,
+                                  y_pymunk - self.height / 2, y_pymunk + self.height / 2, self)
+        
+        # Screen outline, open at the top: top of the left wall, bottom corners, top of the right wall
+        self.outline = [to_pygame(self.left_wall.b), to_pygame(self.left_wall.a),
+                        to_pygame(self.right_wall.a), to_pygame(self.right_wall.b)]
         
         self.exploded = False  # Track if the bucket has exploded
+        if attach:
+            self.attach()
+
+    def attach(self):
+        """Add the walls and sensor to the space."""
+        self.space.add(self.left_wall, self.right_wall, self.bottom_wall, self.sensor)
+
     def get_collected_count(self):
         """Return the number of sugar grains collected in this bucket."""
         return self.count
@@ -65,7 +130,7 @@ class Bucket:
         """
         Apply a radial force to all grains near the bucket and remove the bucket walls.
         
-        :param grains: List of sugar grain objects in the game.
+        :param grains: The GrainSystem holding the game's grains.
         """
         if self.exploded:
             return  # Prevent multiple explosions
@@ -74,31 +139,16 @@ class Bucket:
         bucket_center_x = (self.left_wall.a[0] + self.right_wall.a[0]) / 2
         bucket_center_y = (self.left_wall.a[1] + self.left_wall.b[1]) / 2
 
-        # Apply radial force to each grain
-        for grain in grains:
-            grain_pos = grain.body.position
-
-            # Calculate the vector from the bucket center to the grain
-            dx = grain_pos.x - bucket_center_x
-            dy = grain_pos.y - bucket_center_y
-            distance = sqrt(dx**2 + dy**2)
-
-            if distance < 2:  # Only affect grains within a certain radius
-                # Normalize the vector
-                if distance > 0:
-                    dx /= distance
-                    dy /= distance
-
-                # Apply a radial impulse (adjust magnitude as needed)
-                impulse_magnitude = 20 / (distance + 0.1)  # Reduce force with distance
-                impulse = (dx * impulse_magnitude, dy * impulse_magnitude)
-                grain.body.apply_impulse_at_world_point(impulse, grain.body.position)
-
-        for constraint in self.grain_constraints:
-            self.space.remove(constraint)
-        self.grain_constraints.clear()
+        # The pile becomes dynamic again and is blown out with the rest
+        for sugar_grain in self.pile:
+            grains.unsettle(sugar_grain)
+        self.pile.clear()
+
+        # Apply a radial impulse to grains within a certain radius, reduced with distance
+        grains.apply_radial_impulse((bucket_center_x, bucket_center_y), 2, 20)
+
         # Remove the bucket walls
-        self.space.remove(self.left_wall, self.right_wall, self.bottom_wall)
+        self.space.remove(self.left_wall, self.right_wall, self.bottom_wall, self.sensor)
 
         self.exploded = True  # Mark the bucket as exploded
         
@@ -110,63 +160,64 @@ class Bucket:
         if self.exploded:
             return  # Don't draw if the bucket has exploded
 
-        color = (144, 238, 144)  # Light green color
-
-        # Helper function to convert Pymunk coordinates to Pygame coordinates
-        def to_pygame(p):
-            return int(p[0] * SCALE), int(HEIGHT - p[1] * SCALE)
-
         # Draw the bucket edges
-        pg.draw.line(screen, color, to_pygame(self.left_wall.a), to_pygame(self.left_wall.b), 2)
-        pg.draw.line(screen, color, to_pygame(self.right_wall.a), to_pygame(self.right_wall.b), 2)
-        pg.draw.line(screen, color, to_pygame(self.bottom_wall.a), to_pygame(self.bottom_wall.b), 2)
+        pg.draw.lines(screen, BUCKET_COLOR, False, self.outline, 2)
 
     def count_reset(self):
         if not self.exploded:
             self.count = 0
 
         
-    def collect(self, sugar_grain):
+    def grain_entered(self, sugar_grain, grains):
+        """Sensor callback: a grain started overlapping the bucket interior."""
+        self.collect(sugar_grain, grains)
+
+    def pile_position(self, index):
+        """
+        Return where the index-th settled grain rests, filling rows from the
+        bottom of the bucket up, in Pymunk units. Grains past a full bucket
+        stack on the top row.
+
+        :param index: Position of the grain in the pile.
+        """
+        inside = self.left_wall.radius + PILE_SPACING / 2  # Keep clear of the walls
+        left = self.left_wall.a[0] + inside
+        bottom = self.bottom_wall.a[1] + inside
+        columns = max(1, int((self.right_wall.a[0] - inside - left) / PILE_SPACING) + 1)
+        rows = max(1, int((self.left_wall.b[1] - inside - bottom) / PILE_SPACING) + 1)
+        row, column = divmod(index, columns)
+        return left + column * PILE_SPACING, bottom + min(row, rows - 1) * PILE_SPACING
+
+    def collect(self, sugar_grain, grains):
         """
-        Check if a sugar grain is within the bucket bounds and, if so, increase the bucket's count.
+        Count a sugar grain that entered the bucket and settle it on the pile,
+        out of the physics until the bucket explodes.
+        Called from the interior sensor's collision callback.
         
-        :param sugar_grain: The sugar grain to check.
+        :param sugar_grain: The sugar grain to collect.
+        :param grains: The GrainSystem, pushed apart if the bucket explodes.
         :return: True if the grain was collected, False otherwise.
         """
         if self.exploded:
-            return  # Don't count grains if the bucket has exploded
-
-        # Get the grain's position
-        grain_pos = sugar_grain.body.position
-
-        # Calculate the bucket boundaries using the wall positions
-        left = self.left_wall.a[0]  # x-coordinate of the left wall
-        right = self.right_wall.a[0]  # x-coordinate of the right wall
-        bottom = self.bottom_wall.a[1]  # y-coordinate of the bottom wall
-        top = self.left_wall.b[1]  # y-coordinate of the top of the left wall
-
-        # Check if the grain's position is within the bucket's bounding box
-        if left <= grain_pos.x <= right and bottom <= grain_pos.y <= top:
-            if sugar_grain not in self.collected_sugar:  # Avoid double-collecting
-                bucket_center = pymunk.Vec2d((left + right) / 2, (bottom + top) / 2)
-                joint = pymunk.PinJoint(sugar_grain.body, self.space.static_body, (0, 0), bucket_center)
-                self.space.add(joint)
-                self.grain_constraints.append(joint)
-                self.collected_sugar.append(sugar_grain)
-                sugar_grain.body.velocity = (0, 0)  # Add to collected list
-                self.count += 1  # Increase count
-                self.music.play_sound_effect("add_ball")  # Play sound effect
-
-                # Check if the bucket should explode
-                if self.count >= self.needed_sugar and not self.exploded:
-                    self.explode(self.collected_sugar)  # Trigger explosion
-                    self.music.play_sound_effect("bucket")
-                      # Play explosion sound
-                return True  # Indicate successful collection
-
-        return False  # Grain was not collected
+            return False  # Don't count grains if the bucket has exploded
+
+        if sugar_grain in self.collected_sugar:  # Avoid double-collecting
+            return False
+
+        grains.settle(sugar_grain, self.pile_position(len(self.pile)))
+        self.pile.append(sugar_grain)
+        self.collected_sugar.add(sugar_grain)  # Add to collected set
+        self.count += 1  # Increase count
+        play_sound_effect("add_ball")  # Play sound effect
+
+        # Check if the bucket should explode
+        if self.count >= self.needed_sugar and not self.exploded:
+            self.explode(grains)  # Trigger explosion
+            play_sound_effect("bucket")  # Play explosion sound
+        return True  # Indicate successful collection
     def delete(self):
             if not self.exploded:
-                # Remove the bucket walls
-                self.space.remove(self.left_wall, self.right_wall, self.bottom_wall)
+                # Remove the bucket walls. The pile goes when the GrainSystem is cleared.
+                self.pile.clear()
+                self.space.remove(self.left_wall, self.right_wall, self.bottom_wall, self.sensor)
                 self.exploded = True
@@ -0,0 +1,70 @@
+#############################################################
+# Module Name: Sugar Pop Collisions Module
+# Project: Sugar Pop Program
+# Date: Oct 18, 2026
+# By: Eyasu Smieja
+# Description: Collision callback helpers for the sugar pop game
+#############################################################
+
+
+def on_collision(space, collision_type_a, collision_type_b, begin=None, separate=None, data=None):
+    """
+    Register begin/separate callbacks for two collision types.
+
+    Pymunk 7 replaced add_collision_handler() with Space.on_collision(), and
+    begin callbacks no longer return a bool. This accepts the Pymunk 7 style
+    callback(arbiter, space, data) and works with either version.
+
+    :param space: The Pymunk space.
+    :param collision_type_a: Collision type of the first shape (arbiter.shapes[0]).
+    :param collision_type_b: Collision type of the second shape (arbiter.shapes[1]).
+    :param begin: Called when the shapes first touch.
+    :param separate: Called when the shapes stop touching or one is removed.
+    :param data: Passed unchanged as the callbacks' data argument.
+    """
+    if hasattr(space, "on_collision"):  # Pymunk 7 and newer
+        space.on_collision(collision_type_a, collision_type_b, begin=begin, separate=separate, data=data)
+        return
+
+    handler = space.add_collision_handler(collision_type_a, collision_type_b)
+    if begin is not None:
+        def begin_and_process(arbiter, space, _):
+            begin(arbiter, space, data)
+            return True  # Let the collision be processed as usual
+        handler.begin = begin_and_process
+    if separate is not None:
+        handler.separate = lambda arbiter, space, _: separate(arbiter, space, data)
+
+
+def wake_touching(space, *shapes):
+    """
+    Wake the sleeping bodies overlapping static shapes just added to the space.
+
+    Chipmunk wakes sleeping bodies when gravity changes, when they get an
+    impulse, or when a static shape they rest on is removed, but not when a
+    static shape is added on top of them.
+
+    :param space: The Pymunk space the shapes were added to.
+    :param shapes: The new shapes.
+    """
+    for shape in shapes:
+        for hit in space.shape_query(shape):
+            body = hit.shape.body
+            if body.body_type == body.DYNAMIC and body.is_sleeping:
+                body.activate()
+
+
+def ordered_shapes(arbiter, collision_type_a):
+    """
+    Return the arbiter's two shapes with the collision_type_a shape first.
+
+    Pymunk normally orders them to match the handler, but separate callbacks
+    fired while bodies are being removed can arrive swapped.
+
+    :param arbiter: The arbiter passed to the collision callback.
+    :param collision_type_a: Collision type expected on the first shape.
+    """
+    shape_a, shape_b = arbiter.shapes
+    if shape_a.collision_type != collision_type_a:
+        return shape_b, shape_a
+    return shape_a, shape_b
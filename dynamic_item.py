@@ -7,12 +7,52 @@
 #############################################################
 
 
+import math
 import pygame as pg
 import pymunk
-from settings import SCALE, HEIGHT, WIDTH
+from settings import SCALE, HEIGHT, WIDTH, LINE_SIMPLIFY_TOLERANCE
+from collisions import wake_touching
+
+
+def distance_to_chord(point, start, end):
+    """Return the distance from point to the segment start-end."""
+    (px, py), (ax, ay), (bx, by) = point, start, end
+    dx, dy = bx - ax, by - ay
+    length_squared = dx * dx + dy * dy
+    t = 0.0 if length_squared == 0 else min(max(((px - ax) * dx + (py - ay) * dy) / length_squared, 0.0), 1.0)
+    return math.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+def simplify_polyline(points, tolerance):
+    """
+    Douglas-Peucker: drop every point that stays within tolerance of the
+    line kept around it. The first and last points are always kept.
+
+    :param points: List of (x, y).
+    :param tolerance: Largest distance a dropped point may be from the result.
+    :return: The kept points, in order.
+    """
+    if len(points) < 3:
+        return list(points)
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    ranges = [(0, len(points) - 1)]
+    while ranges:
+        first, last = ranges.pop()
+        farthest, distance = first, 0.0
+        for i in range(first + 1, last):
+            d = distance_to_chord(points[i], points[first], points[last])
+            if d > distance:
+                farthest, distance = i, d
+        if distance > tolerance:
+            keep[farthest] = True
+            ranges.append((first, farthest))
+            ranges.append((farthest, last))
+    return [point for point, kept in zip(points, keep) if kept]
+
 
 class DynamicItem:
-    def __init__(self, space, color='red', friction=0.3, elasticity=0.5, thickness=0.2):
+    def __init__(self, space, color='red', friction=0.3, elasticity=0.5, thickness=0.2, max_segments=None):
         """
         Initialize the dynamic item.
 
@@ -20,21 +60,36 @@ class DynamicItem:
         :param color: The color for drawing the item.
         :param friction: The friction coefficient of the item's surfaces.
         :param elasticity: The elasticity (bounciness) of the item's surfaces.
+        :param max_segments: Most segments the line may have, None for no limit.
         """
         self.color = color
         self.space = space
         self.friction = friction
         self.elasticity = elasticity
         self.thickness = thickness
+        self.max_segments = max_segments
+        self.tolerance = LINE_SIMPLIFY_TOLERANCE / SCALE
         self.vertices = []  # Store vertices as they are added
         self.segments = []  # Store the segments created
+        self.points = None  # Vertices in screen coordinates for draw(), None when they need converting again
+        self.merged = []  # Points merged into the last segment, kept to check the next merge against
         # Create a static body to attach the segments to
         self.body = pymunk.Body(body_type=pymunk.Body.STATIC)
         self.space.add(self.body)
 
+    def make_segment(self, start, end):
+        """Return a segment of this line from start to end, not yet in the space."""
+        segment = pymunk.Segment(self.body, start, end, self.thickness)
+        segment.friction = self.friction
+        segment.elasticity = self.elasticity
+        return segment
+
     def add_vertex(self, x, y):
         """
         Add a new vertex and create a Segment between the last vertex and the new one.
+        A vertex in line with the last segment stretches that segment instead.
+
+        :return: False if the segment budget is used up and the vertex was dropped.
         """
         # Convert the Pygame coordinates to Pymunk coordinates (Pymunk's Y-axis points upwards)
         adjusted_x = x / SCALE
@@ -42,18 +97,53 @@ class DynamicItem:
 
         # Add the new vertex with adjusted coordinates
         new_vertex = (adjusted_x, adjusted_y)
-        
+        if self.vertices and new_vertex == self.vertices[-1]:
+            return True  # The mouse did not move
+
+        if self.segments:
+            # Merge when the last vertex, and every point merged before it, stays close to the longer segment
+            start = self.vertices[-2]
+            passed = self.merged + [self.vertices[-1]]
+            if all(distance_to_chord(point, start, new_vertex) <= self.tolerance for point in passed):
+                segment = self.segments[-1]
+                segment.unsafe_set_endpoints(start, new_vertex)
+                self.space.reindex_shape(segment)
+                wake_touching(self.space, segment)
+                self.vertices[-1] = new_vertex
+                self.points = None
+                self.merged = passed
+                return True
+
         if self.vertices:
+            if self.max_segments is not None and len(self.segments) >= self.max_segments:
+                return False
             # Create a segment between the last vertex and the new vertex
-            last_vertex = self.vertices[-1]
-            segment = pymunk.Segment(self.body, last_vertex, new_vertex, self.thickness)  # Thickness of 0.1 units
-            segment.friction = self.friction
-            segment.elasticity = self.elasticity
+            segment = self.make_segment(self.vertices[-1], new_vertex)
             self.space.add(segment)
+            wake_touching(self.space, segment)  # Grains asleep under the new segment must feel it
             self.segments.append(segment)
-        
+            self.merged = []
+
         # Add the new vertex to the list
         self.vertices.append(new_vertex)
+        self.points = None
+        return True
+
+    def finish(self):
+        """
+        Simplify the finished line with Douglas-Peucker and swap its
+        segments for the simplified ones in one batch.
+        """
+        vertices = simplify_polyline(self.vertices, self.tolerance)
+        self.merged = []
+        if len(vertices) == len(self.vertices):
+            return  # Nothing to drop
+        self.space.remove(*self.segments)
+        self.vertices = vertices
+        self.points = None
+        self.segments = [self.make_segment(start, end) for start, end in zip(vertices, vertices[1:])]
+        self.space.add(*self.segments)
+        wake_touching(self.space, *self.segments)
 
     def set_color(self, color='blue'):
         """
@@ -63,21 +153,31 @@ class DynamicItem:
         """
         self.color = color
         
-    def draw(self, screen):
+    def screen_points(self):
+        """
+        Return the vertices in screen coordinates, converted only after they change.
+        The list is replaced rather than changed, so another thread can keep drawing it.
+        """
+        points = self.points
+        if points is None:
+            points = self.points = [(x * SCALE, HEIGHT - y * SCALE) for x, y in self.vertices]
+        return points
+
+    def draw(self, screen, points=None):
         """
         Draw the chain shape (edges) on the Pygame screen.
+
+        :param points: Screen points from screen_points() to draw. Defaults to the current ones.
+        :return: The area drawn, or None if there are no segments yet.
         """
+        if points is None:
+            points = self.screen_points()
+        if len(points) < 2:
+            return None
+
         # Calculate the visual line width based on thickness
         line_width = max(1, int(self.thickness * SCALE * 0.7))
-    
-        for i in range(len(self.vertices) - 1):
-            start_x = self.vertices[i][0] * SCALE
-            start_y = HEIGHT - self.vertices[i][1] * SCALE
-            end_x = self.vertices[i + 1][0] * SCALE
-            end_y = HEIGHT - self.vertices[i + 1][1] * SCALE
-            start = (start_x, start_y)
-            end = (end_x, end_y)
-            pg.draw.line(screen, pg.Color(self.color), start, end, line_width)
+        return pg.draw.lines(screen, pg.Color(self.color), False, points, line_width)
 
     def delete(self):
         """
@@ -93,3 +193,4 @@ class DynamicItem:
             self.body = None
         # Clear the vertices list
         self.vertices = []
+        self.points = None
@@ -0,0 +1,352 @@
+#############################################################
+# Module Name: Sugar Pop Grain System Module
+# Project: Sugar Pop Program
+# Date: Oct 18, 2026
+# By: Eyasu Smieja
+# Description: Owns every sugar grain and works on them in bulk
+#############################################################
+
+import numpy as np
+import pygame as pg
+import pymunk
+import pymunk.batch
+from settings import SCALE, WIDTH, HEIGHT, MAX_TIME_STEP, DIRTY_TILE_SIZE, GRAIN_POOL_CAPACITY
+from sugar_grain import Sugar_Grain
+
+# Body fields copied out of Pymunk for each snapshot
+SNAPSHOT_FIELDS = (pymunk.batch.BodyFields.BODY_ID |
+                   pymunk.batch.BodyFields.POSITION |
+                   pymunk.batch.BodyFields.VELOCITY)
+
+# Screen tiles used to find where grains changed between frames
+TILE_COLUMNS = -(-WIDTH // DIRTY_TILE_SIZE)
+TILE_ROWS = -(-HEIGHT // DIRTY_TILE_SIZE)
+
+
+def pixel_hash(keys):
+    """
+    Spread integer pixel keys into random-looking 64-bit values (splitmix64).
+    Sums of these (mod 2**64) only collide for different pixel sets by chance.
+
+    :param keys: Array of non-negative integer keys.
+    :return: uint64 array, same shape as keys.
+    """
+    z = keys.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+class GrainPool:
+    def __init__(self, space, capacity=GRAIN_POOL_CAPACITY):
+        """
+        Keep removed grains, with their bodies and shapes, outside the space
+        so new grains reuse them instead of allocating.
+
+        :param space: The Pymunk space the grains belong to.
+        :param capacity: Most grains kept parked. Grains released past it are dropped.
+        """
+        self.space = space
+        self.capacity = capacity
+        self.parked = []
+        self.allocated = 0  # Grains ever created by the pool
+
+    def acquire(self, x, y, friction=0.3):
+        """
+        Return a grain in the space at (x, y), reused if one is parked.
+
+        :param x: Initial x position in Pygame coordinates.
+        :param y: Initial y position in Pygame coordinates.
+        :param friction: Friction of the grain.
+        """
+        if self.parked:
+            grain = self.parked.pop()
+            grain.reset(x, y, friction)
+            return grain
+        self.allocated += 1
+        return Sugar_Grain(self.space, x, y, friction)
+
+    def release(self, grain, in_space=True):
+        """
+        Take a grain out of the space and park it for reuse.
+
+        :param grain: The grain to park.
+        :param in_space: False for a grain already out of the space, like a settled one.
+        """
+        if in_space:
+            grain.delete()
+        if len(self.parked) < self.capacity:
+            self.parked.append(grain)
+
+    def reserve(self, count):
+        """
+        Allocate parked grains up front, so spawning count grains allocates nothing.
+
+        :param count: Number of grains wanted, limited to the capacity.
+        """
+        while len(self.parked) < min(count, self.capacity):
+            grain = Sugar_Grain(self.space, 0, 0)
+            grain.delete()
+            self.parked.append(grain)
+            self.allocated += 1
+
+
+class GrainSystem:
+    def __init__(self, space):
+        """
+        Hold all sugar grains of a space and keep a NumPy snapshot of their
+        positions and velocities, so per-step work runs over arrays instead
+        of touching each grain's body from Python.
+
+        :param space: The Pymunk space the grains live in.
+        """
+        self.space = space
+        self.pool = GrainPool(space)  # Where grains come from and go back to
+        self.grains = {}  # Body id -> Sugar_Grain, in spawn order
+        self.color = pg.Color('white')
+
+        # Grains banked in a bucket rest out of the space, so the solver only works on free grains
+        self.settling = {}  # Grain -> (x, y) to settle at after the current step
+        self.settled = {}  # Grain -> (x, y) it rests at, in Pymunk units
+        self.unsettling = []  # Settled grains to put back in the space after the current step
+        self._settled_rows = None  # (ids, data) rows the settled grains add to the snapshot, None when stale
+
+        # Snapshot arrays, one row per grain. Row order follows the space, not spawn order.
+        self.ids = np.empty(0, dtype=np.uintp)
+        self.positions = np.empty((0, 2))
+        self.velocities = np.empty((0, 2))
+
+        self._buffer = pymunk.batch.Buffer()  # Reused between snapshots
+        self._tile_state = np.zeros((2, TILE_COLUMNS * TILE_ROWS), dtype=np.uint64)  # Per-tile grain fingerprint of the last frame
+        self._grain_ids = np.empty(0, dtype=np.uintp)  # Sorted ids of our grains
+        self._grain_ids_stale = False
+
+    def __getstate__(self):
+        # The batch buffer is scratch space and cannot be pickled, see Game.save_state()
+        state = self.__dict__.copy()
+        del state['_buffer']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._buffer = pymunk.batch.Buffer()
+        # Copied bodies get new ids
+        self.grains = {grain.body.id: grain for grain in self.grains.values()}
+        self._grain_ids_stale = True
+        self._settled_rows = None
+
+    def __len__(self):
+        return len(self.grains)
+
+    def __iter__(self):
+        return iter(self.grains.values())
+
+    def spawn(self, x, y, friction=0.3):
+        """
+        Add a sugar grain, reusing a pooled one when possible.
+
+        :param x: Initial x position in Pygame coordinates.
+        :param y: Initial y position in Pygame coordinates.
+        :param friction: Friction of the grain.
+        :return: The new Sugar_Grain.
+        """
+        grain = self.pool.acquire(x, y, friction)
+        self.grains[grain.body.id] = grain
+        self._grain_ids_stale = True
+        return grain
+
+    def clear(self):
+        """Remove every grain from the space, parking them in the pool."""
+        for grain in self.grains.values():
+            self.pool.release(grain, in_space=grain not in self.settled and grain not in self.unsettling)
+        self.grains = {}
+        self.settling = {}
+        self.settled = {}
+        self.unsettling = []
+        self._settled_rows = None
+        self._grain_ids_stale = True
+        self.snapshot()
+
+    def settle(self, grain, position):
+        """
+        Retire a grain from the physics after the current step. It is taken
+        out of the space and kept at rest at position, still in the snapshot
+        arrays so it is drawn. Safe to call from a collision callback.
+
+        :param grain: A grain of this system.
+        :param position: (x, y) to rest at, in Pymunk units.
+        """
+        self.settling[grain] = position
+
+    def unsettle(self, grain):
+        """
+        Make a grain passed to settle() dynamic again, where it was shown.
+        It goes back in the space after the current step, keeping any
+        impulse it gets until then. Safe to call from a collision callback.
+
+        :param grain: A grain passed to settle().
+        """
+        if self.settling.pop(grain, None) is not None:
+            return  # Never left the space
+        x, y = self.settled.pop(grain)
+        grain.body.position = x, y
+        self.unsettling.append(grain)
+        self._settled_rows = None
+
+    def process_settling(self):
+        """
+        Move the grains queued by settle() and unsettle() in or out of the
+        space. Call after space.step(). Pymunk defers changes made during a
+        step in hash order, doing them here keeps replays deterministic.
+        """
+        for grain, position in self.settling.items():
+            grain.delete()
+            grain.body.velocity = (0, 0)
+            grain.body.angular_velocity = 0
+            self.settled[grain] = position
+        for grain in self.unsettling:
+            self.space.add(grain.body, grain.shape)
+        if self.settling or self.unsettling:
+            self.settling.clear()
+            self.unsettling.clear()
+            self._settled_rows = None
+            self._grain_ids_stale = True
+
+    def snapshot(self):
+        """
+        Copy the position and velocity of every grain into self.positions
+        and self.velocities (Pymunk units) with one batch call.
+        """
+        if self._grain_ids_stale:
+            self._grain_ids = np.sort(np.fromiter(self.grains.keys(), dtype=np.uintp, count=len(self.grains)))
+            self._grain_ids_stale = False
+
+        self._buffer.clear()
+        pymunk.batch.get_space_bodies(self.space, SNAPSHOT_FIELDS, self._buffer)
+        ids = np.frombuffer(self._buffer.int_buf(), dtype=np.uintp)
+        data = np.frombuffer(self._buffer.float_buf(), dtype=np.float64).reshape(-1, 4)
+
+        # The space also holds static and kinematic bodies, keep only grains.
+        # Indexing copies, so the arrays survive the buffer being reused.
+        keep = np.isin(ids, self._grain_ids, assume_unique=True)
+        ids = ids[keep]
+        data = data[keep]
+
+        # Settled grains are out of the space, add their resting rows
+        if self.settled:
+            if self._settled_rows is None:
+                settled_ids = np.fromiter((grain.body.id for grain in self.settled), dtype=np.uintp, count=len(self.settled))
+                settled_data = np.zeros((len(self.settled), 4))
+                settled_data[:, 0:2] = list(self.settled.values())
+                self._settled_rows = settled_ids, settled_data
+            ids = np.concatenate((ids, self._settled_rows[0]))
+            data = np.concatenate((data, self._settled_rows[1]))
+
+        self.ids = ids
+        self.positions = data[:, 0:2]
+        self.velocities = data[:, 2:4]
+
+    def grain_at(self, row):
+        """Return the grain of a snapshot row."""
+        return self.grains[int(self.ids[row])]
+
+    def rows_near(self, center, radius):
+        """
+        Find the snapshot rows within radius of center.
+
+        :param center: (x, y) in Pymunk units.
+        :param radius: Distance in Pymunk units.
+        :return: (rows, offsets from center, distances)
+        """
+        offsets = self.positions - center
+        distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        rows = np.flatnonzero(distances < radius)
+        return rows, offsets[rows], distances[rows]
+
+    def apply_radial_impulse(self, center, radius, strength):
+        """
+        Push grains near center outwards, weaker the further away they are.
+
+        :param center: (x, y) in Pymunk units.
+        :param radius: Only grains closer than this are affected.
+        :param strength: Impulse scale, divided by (distance + 0.1).
+        """
+        rows, offsets, distances = self.rows_near(center, radius)
+
+        # Normalize the vectors (grains right at the center get no direction)
+        safe = np.where(distances > 0, distances, 1.0)
+        impulses = offsets / safe[:, None] * (strength / (distances + 0.1))[:, None]
+
+        for row, (impulse_x, impulse_y) in zip(rows, impulses.tolist()):
+            grain = self.grain_at(row)
+            if grain in self.settled:
+                continue  # Resting in a bucket that did not explode
+            body = grain.body
+            body.apply_impulse_at_world_point((impulse_x, impulse_y), body.position)
+
+    def screen_positions(self, alpha=0.0, positions=None, velocities=None):
+        """
+        Convert all positions to Pygame coordinates at once.
+
+        :param alpha: Fraction of a physics step to extrapolate positions by.
+        :param positions, velocities: Arrays from an earlier snapshot to use instead of the latest.
+        :return: (x, y) integer arrays of the top-left pixel of each visible grain's square.
+        """
+        if positions is None:
+            positions, velocities = self.positions, self.velocities
+        positions = positions + velocities * (alpha * MAX_TIME_STEP)
+        screen_x = np.floor(positions[:, 0] * SCALE - 1).astype(np.intp)
+        screen_y = np.floor(HEIGHT - positions[:, 1] * SCALE - 1).astype(np.intp)
+
+        # Drop grains whose square would fall off the screen
+        visible = (screen_x >= 0) & (screen_x < WIDTH - 1) & (screen_y >= 0) & (screen_y < HEIGHT - 1)
+        return screen_x[visible], screen_y[visible]
+
+    def changed_rects(self, screen_positions):
+        """
+        Compare the grains in each screen tile with the last call and return
+        the tiles that look different, grown by the 2 px a square can overhang.
+
+        :param screen_positions: (x, y) arrays from screen_positions().
+        :return: List of pg.Rect to redraw and push to the display.
+        """
+        screen_x, screen_y = screen_positions
+        tiles = (screen_y // DIRTY_TILE_SIZE) * TILE_COLUMNS + screen_x // DIRTY_TILE_SIZE
+        # Grain count plus the wrapping sum of the grains' pixel hashes per tile. Grains that
+        # did not move keep them equal, any move changes the sum except by a 2**-64 chance.
+        size = TILE_COLUMNS * TILE_ROWS
+        state = np.zeros((2, size), dtype=np.uint64)
+        state[0] = np.bincount(tiles, minlength=size)
+        np.add.at(state[1], tiles, pixel_hash(screen_x * HEIGHT + screen_y))
+        changed = np.flatnonzero((state != self._tile_state).any(axis=0))
+        self._tile_state = state
+
+        rects = []
+        for tile in changed.tolist():
+            row, column = divmod(tile, TILE_COLUMNS)
+            rects.append(pg.Rect(column * DIRTY_TILE_SIZE - 2, row * DIRTY_TILE_SIZE - 2,
+                                 DIRTY_TILE_SIZE + 4, DIRTY_TILE_SIZE + 4))
+        return rects
+
+    def draw(self, screen, alpha=0.0, screen_positions=None):
+        """
+        Draw every grain as a 2x2 square, written straight into the
+        surface's pixels in one array operation.
+
+        :param screen: The Pygame surface to draw on.
+        :param alpha: Fraction of a physics step to extrapolate positions by.
+        :param screen_positions: Already converted positions, from screen_positions().
+        """
+        if screen_positions is None:
+            screen_positions = self.screen_positions(alpha)
+        screen_x, screen_y = screen_positions
+        if not len(screen_x):
+            return
+
+        pixels = pg.surfarray.pixels2d(screen)  # Locks the surface until deleted
+        color = screen.map_rgb(self.color)
+        pixels[screen_x, screen_y] = color
+        pixels[screen_x + 1, screen_y] = color
+        pixels[screen_x, screen_y + 1] = color
+        pixels[screen_x + 1, screen_y + 1] = color
+        del pixels
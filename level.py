@@ -6,8 +6,74 @@
 # Description: The level implementation of the sugar pop game
 #############################################################
 
+import hashlib
 import json
 import os
+import pickle
+from settings import LEVEL_CACHE_DIR, LINE_SEGMENT_BUDGET
+from teleport import DEFAULT_ZONE_RADIUS
+
+# Bump when the compiled layout changes, so old cache files are rebuilt
+COMPILED_FORMAT = 3
+
+# Defaults for optional static fields
+STATIC_DEFAULTS = {"color": "gray", "line_width": 3, "friction": 0.3, "restitution": 0.5}
+
+# Defaults for optional teleportation fields, in Pygame units
+TELEPORT_DEFAULTS = {"entry_radius": DEFAULT_ZONE_RADIUS, "exit_radius": DEFAULT_ZONE_RADIUS}
+
+
+def _point(value):
+    """Return an [x, y] pair from level JSON as a tuple of floats."""
+    x, y = value
+    return float(x), float(y)
+
+
+def compile_level(data):
+    """
+    Validate level JSON and turn it into the compact form the game builds from.
+    Numbers are converted to float or int, optional fields get their defaults,
+    and statics repeated in the file (in either direction) are kept once.
+    Positions stay in Pygame units, which is what the game objects take.
+
+    :param data: The level as loaded from JSON.
+    :return: Dict of tuples, see the keys below.
+    :raises ValueError: If a required field is missing or not a number.
+    """
+    try:
+        statics = []
+        seen = set()
+        for nb in data['statics']:
+            start = (float(nb['x1']), float(nb['y1']))
+            end = (float(nb['x2']), float(nb['y2']))
+            options = {key: nb.get(key, default) for key, default in STATIC_DEFAULTS.items()}
+            static = (start + end + (str(options['color']), int(options['line_width']),
+                                     float(options['friction']), float(options['restitution'])))
+            key = (min(start, end), max(start, end)) + static[4:]
+            if key not in seen:
+                seen.add(key)
+                statics.append(static)
+
+        buckets = tuple((float(nb['x']), float(nb['y']), float(nb['width']), float(nb['height']),
+                         int(nb['needed_sugar'])) for nb in data['buckets'])
+
+        teleportations = tuple((_point(tp['entry']), _point(tp['exit']),
+                                float(tp.get('entry_radius', TELEPORT_DEFAULTS['entry_radius'])),
+                                float(tp.get('exit_radius', TELEPORT_DEFAULTS['exit_radius'])))
+                               for tp in data.get('teleportations', ()))
+
+        return {
+            'number_sugar_grains': int(data.get('number_sugar_grains', 0)),
+            'spout': (float(data['spout_x']), float(data['spout_y'])),
+            'statics': tuple(statics),  # (x1, y1, x2, y2, color, line_width, friction, restitution)
+            'buckets': buckets,  # (x, y, width, height, needed_sugar)
+            'teleportations': teleportations,  # ((x, y) entry, (x, y) exit, entry_radius, exit_radius)
+            'time_to_complete_level': data.get('time_to_complete_level', 0),
+            'line_segment_budget': int(data.get('line_segment_budget', LINE_SEGMENT_BUDGET)),
+        }
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Invalid level data: {e!r}") from e
+
 
 class Level:
     def __init__(self, level_file=None):
@@ -17,6 +83,7 @@ class Level:
         :param level_file: Path to the JSON file for the level. If None, an empty level is created.
         """
         self.level_file = level_file
+        self.compiled = None  # Set by load_level(), see compile_level()
         self.data = {
             "number_sugar_grains": 0,
             "static_boxes": [],
@@ -32,14 +99,58 @@ class Level:
 
     def load_level(self, level_file):
         """
-        Load a level from a JSON file.
+        Load a level, from the compiled cache when the JSON file has not changed.
         """
         try:
-            with open(level_file, 'r') as f:
-                self.data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
+            stat = os.stat(level_file)
+            cache_file = os.path.join(LEVEL_CACHE_DIR, os.path.basename(level_file) + '.pickle')
+            cached = self.read_cache(cache_file)
+
+            # Same modification time and size: trust the cache without reading the JSON
+            if cached and (cached['mtime'], cached['size']) == (stat.st_mtime_ns, stat.st_size):
+                self.data, self.compiled = cached['data'], cached['compiled']
+                return
+
+            with open(level_file, 'rb') as f:
+                source = f.read()
+            digest = hashlib.sha256(source).hexdigest()
+
+            if cached and cached['hash'] == digest:
+                # Touched but not changed, keep the compiled level
+                self.data, self.compiled = cached['data'], cached['compiled']
+            else:
+                self.data = json.loads(source)
+                self.compiled = compile_level(self.data)
+            self.write_cache(cache_file, {'format': COMPILED_FORMAT, 'mtime': stat.st_mtime_ns, 'size': stat.st_size,
+                                          'hash': digest, 'data': self.data, 'compiled': self.compiled})
+        except (FileNotFoundError, json.JSONDecodeError, ValueError) as e:
             print(f"Error loading level: {e}")
             self.data = {}
+            self.compiled = None
+
+    @staticmethod
+    def read_cache(cache_file):
+        """Return the cached entry in cache_file, or None if missing, unreadable or outdated."""
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = pickle.load(f)
+        except Exception:  # A bad cache file can fail in many ways, recompiling the JSON always works
+            return None
+        if not isinstance(cached, dict) or cached.get('format') != COMPILED_FORMAT:
+            return None
+        return cached
+
+    @staticmethod
+    def write_cache(cache_file, entry):
+        """Write a cache entry. Failing to write only costs a recompile next time."""
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            temp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(temp_file, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_file, cache_file)  # Readers never see a half written file
+        except OSError:
+            pass
 
     def save_level(self, level_file=None):
         """
@@ -8,51 +8,146 @@
 
 import pygame as pg
 import pymunk  # Import Pymunk library
+import os
 import sys
+import time
+import argparse
+import pickle
+from concurrent.futures import ThreadPoolExecutor
 from settings import *
 import random
 import static_item
 import dynamic_item
-from sugar_grain import Sugar_Grain
+from grain_system import GrainSystem
 import bucket  
+import teleport
 import level
 import message_display
-from music import Music  
+from music import Music, preload_sounds
 from moving_bucket import MovingBucket 
 from Heads_Up_Display import HeadsUpDisplay
+from profiler import FrameProfiler
+from physics_worker import PhysicsWorker, RenderSnapshot, SnapshotBuffer
+from replay import InputRecorder, ReplayPlayer, read_log
 
 
 
 
+def load_fonts():
+    '''Load the game fonts. Runs on the asset loader thread.'''
+    return {
+        'hud': pg.font.SysFont("Impact", 18),
+        'message': pg.font.SysFont(None, 72),
+        'profiler': pg.font.SysFont("monospace", 14),
+    }
+
+
+def load_intro_image():
+    '''Load the intro image scaled to the screen width. Runs on the asset loader thread.'''
+    image = pg.image.load("./images/SugarPop.png")
+    # Get new height based on correct scale
+    scale_height = int(image.get_height() * (WIDTH / image.get_width()))
+    return pg.transform.scale(image, (WIDTH, scale_height))  # Scale to screen resolution
+
+
 class Game:
-    def __init__(self) -> None:
+    # Attributes that make up the simulation, saved by save_state(). Everything
+    # else is drawing, sound or loading and is rebuilt from these.
+    SIMULATION_STATE = (
+        'space', 'sugar_grains', 'teleports', 'buckets', 'level_buckets', 'statics', 'drawing_lines', 'current_line',
+        'moving_bucket', 'rng', 'iter', 'step_count', 'sim_time', 'sim_timers', 'level', 'current_level',
+        'level_complete', 'game_over', 'is_paused', 'mouse_down', 'level_grain_dropping',
+        'level_spout_position', 'total_sugar_count', 'sugar_used', 'hud_visible',
+    )
+
+    def __init__(self, headless=False, physics_thread=PHYSICS_THREAD, seed=None, record=None) -> None:
+        # Startup is timed from here to the first frame and to the first playable frame
+        self.startup_time = time.perf_counter()
+        self.startup_metrics = {}
+
+        # Per-phase frame timings, off until F3 is pressed
+        self.profiler = FrameProfiler()
+        # Profiler for the phases of step(). With the physics thread it gets its own
+        # instance, never turned on, as the frame profiler is not thread safe.
+        self.step_profiler = FrameProfiler() if physics_thread and not headless else self.profiler
+        self.caption_time = 0  # Ticks of the last caption update
+
+        # Headless mode runs without a window or sound card, for soak tests and benchmarks
+        self.headless = headless
+        if self.headless:
+            # SDL's dummy drivers give us a null video and audio backend
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
         #pygame intialization 
         pg.init()
 
         #Setup screen  
-        self.screen = pg.display.set_mode(RES)
+        if self.headless:
+            self.screen = pg.Surface(RES)  # Off-screen surface, no window is opened
+        else:
+            self.screen = pg.display.set_mode(RES)
         self.clock = pg.time.Clock()
         self.iter = 0
+        self.step_count = 0  # Physics steps run so far, the clock inputs are recorded against
         self.level = None 
+        self.hud_visible = True
+
+        # All game randomness comes from this generator, so a seed and the inputs replay a game exactly
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.recorder = InputRecorder(record, self.seed) if record else None
+        self.timers_enabled = True  # Replays turn timers off and feed the recorded timer events
+
+        # Levels are read and built on this thread while the previous one is still on screen
+        self.level_loader = ThreadPoolExecutor(max_workers=1)
+        self.prefetched = {}  # Level number -> Future of prepare_level()
+
+        # Assets not needed for the first frame load here, behind the intro screen
+        self.asset_loader = ThreadPoolExecutor(max_workers=2)
+        self.fonts_future = self.asset_loader.submit(load_fonts)
+        if not self.headless:
+            self.intro_future = self.asset_loader.submit(load_intro_image)
+            self.asset_loader.submit(preload_sounds)
+
+        # Simulated time (seconds) and timers used in headless mode instead of pg.time.set_timer
+        self.sim_time = 0.0
+        self.sim_timers = {}
+
+        # Fixed timestep state: unsimulated frame time, and how far (0-1) the
+        # rendered frame sits between the last physics step and the next one
+        self.accumulator = 0.0
+        self.interpolation_alpha = 0.0
+
+        # Cached layer of everything that rarely changes. invalidate_background() bumps the
+        # version, and draw() rebuilds the layer when the latest snapshot has a newer one.
+        self.background = None
+        self.background_version = 0
+        self.background_built = -1
+        # Dirty-rectangle state: push the whole screen next frame, and the areas the live layer drew last frame
+        self.full_update = True
+        self.live_rects = []
 
         #game music 
         pg.mixer.pre_init()
         self.music = Music()
         # Play game music when the game starts
-        self.music.channel1.play(pg.mixer.Sound("./music/Game.mp3"))
+        if not self.headless:
+            self.music.play("background")
 
         
 
 
-        # HeadsUpDisplay
-        self.font = pg.font.SysFont("Impact", 18)
+        # HeadsUpDisplay, its font is set by finish_loading()
+        self.font = None
+        self.profiler_font = None
         self.hud = HeadsUpDisplay(self.screen,self.font,position=(2, 30),
                                                         level_position=(self.screen.get_width() - 70, 10),
                                                         sugar_position=(2, 0))
         self.sugar_used = 0 
 
         #Boolean for intro 
-        self.is_intro = True
+        self.is_intro = not self.headless
 
         # Create a Pymunk space with gravity
         self.current_level = 0 #start the level 
@@ -61,19 +156,27 @@ class Game:
         self.space.gravity = (0, -4.8)  # Gravity pointing downwards in Pymunk's coordinate system
         # Iterations defaults to 10. Higher is more accurate collison detection
         self.space.iterations = 30 
+        # Resting grains sleep until something touches them. Setting the gravity wakes them all.
+        self.space.sleep_time_threshold = SLEEP_TIME_THRESHOLD
+        self.space.idle_speed_threshold = IDLE_SPEED_THRESHOLD
         self.is_paused = False 
         self.game_over = False
 
         self.drawing_lines = []
-        self.sugar_grains = []
+        self.sugar_grains = GrainSystem(self.space)  # Owns every grain, with array snapshots
+        # Buckets collect grains through sensor collision callbacks
+        bucket.add_collection_handler(self.space, self.sugar_grains)
+        self.teleports = teleport.TeleportSystem(self.space, self.rng)  # Teleport zones of the current level
+        # Latest grain, bucket and line state for draw(), published after every step
+        self.render_snapshots = SnapshotBuffer()
         self.buckets = []
+        self.level_buckets = []  # Every bucket of the current load, exploded ones too, for run statistics
         #Moving Bucket class intializer 
         self.moving_bucket = MovingBucket(self.space, 335, 678, 50, 46, 30)
 
 
         
         self.statics = []
-        self.teleportation_zones = []
         self.total_sugar_count = None
         self.level_spout_position = None
         self.level_grain_dropping = None
@@ -83,90 +186,178 @@ class Game:
         self.total_sugar = 80
         
 
-        # Load the intro image
-        self.intro_image = pg.image.load("./images/SugarPop.png").convert()  # Load the intro image
-        # Get new height based on correct scale
-        scale_height = int(self.intro_image.get_height() * (WIDTH / self.intro_image.get_width()))
-        self.intro_image = pg.transform.scale(self.intro_image, (WIDTH, scale_height))  # Scale to screen resolution
-        
-        pg.time.set_timer(LOAD_NEW_LEVEL, 2000)  # Load in 2 seconds
+        self.publish_snapshot()
+
+        # The intro image is shown once the loader thread has it
+        self.intro_image = None
+        if self.headless:
+            self.finish_loading()  # Nothing is shown, so skip the intro screen
+        else:
+            self.set_timer(LOAD_NEW_LEVEL, 2000)  # Load in 2 seconds
+            self.prefetch_level(self.current_level + 1)
+
+        # Optional physics thread. From here on it owns the space and the game state.
+        self.physics_worker = None
+        if physics_thread and not self.headless:
+            self.physics_worker = PhysicsWorker(self)
+            self.physics_worker.start()
+
+    def finish_loading(self):
+        '''Wait for the background asset loads and hand the fonts out. Call before the first level.'''
+        fonts = self.fonts_future.result()
+        self.font = fonts['hud']
+        self.hud.font = fonts['hud']
+        self.message_display.font = fonts['message']
+        self.profiler_font = fonts['profiler']
+
+    def record_startup_metric(self, name):
+        '''
+        Record the time since the game was created under name, the first time only.
+        Prints the startup times once the game is interactive.
+
+        :param name: 'time_to_first_frame' or 'time_to_interactive'.
+        '''
+        if name in self.startup_metrics:
+            return
+        self.startup_metrics[name] = (time.perf_counter() - self.startup_time) * 1000
+        if name == 'time_to_interactive':
+            print("Startup: first frame {time_to_first_frame:.0f} ms, "
+                  "interactive {time_to_interactive:.0f} ms".format(**self.startup_metrics))
+
+    def set_timer(self, event_type, millis):
+        '''
+        Schedule a user event like pg.time.set_timer. In headless mode the
+        timer runs on simulated time so it fires at the right physics step.
+
+        :param event_type: The user event to post.
+        :param millis: Delay in milliseconds. 0 disables the timer.
+        '''
+        if not self.timers_enabled:
+            return
+        if not self.headless:
+            pg.time.set_timer(event_type, millis)
+        elif millis > 0:
+            period = millis / 1000.0
+            self.sim_timers[event_type] = (self.sim_time + period, period)
+        else:
+            self.sim_timers.pop(event_type, None)
+
+    def due_sim_events(self):
+        '''Return the headless timer events that have come due.'''
+        events = []
+        for event_type, (due, period) in list(self.sim_timers.items()):
+            if self.sim_time >= due:
+                # Like pygame timers, they repeat until cleared
+                self.sim_timers[event_type] = (due + period, period)
+                events.append(pg.event.Event(event_type))
+        return events
+
+    def prefetch_level(self, levelnumber):
+        '''
+        Start reading and building a level on the loader thread, so
+        load_level() only has to attach the result to the space.
+
+        :param levelnumber: The level to prepare.
+        '''
+        if levelnumber not in self.prefetched:
+            self.prefetched[levelnumber] = self.level_loader.submit(self.prepare_level, levelnumber)
+
+    def prepare_level(self, levelnumber):
+        '''
+        Read a level file and build its physics objects without adding them
+        to the space. Safe to run off the main thread.
+
+        :param levelnumber: The level to prepare.
+        :return: Dict of the level and its unattached objects, or None if the file is missing.
+        '''
+        new_level = level.Level(LEVEL_FILE_NAME.replace("X", str(levelnumber)))
+        compiled = new_level.compiled  # Validated, with repeated statics removed
+        if not compiled:
+            return None
+
+        statics = self.build_main_walls()
+        for x1, y1, x2, y2, color, line_width, friction, restitution in compiled['statics']:
+            statics.append(static_item.StaticItem(self.space, x1, y1, x2, y2, color, line_width, friction, restitution, attach=False))
+        return {
+            'level': new_level,
+            'statics': statics,
+            'buckets': [bucket.Bucket(self.space, x, y, width, height, needed_sugar, attach=False)
+                        for x, y, width, height, needed_sugar in compiled['buckets']],
+            'teleport_zones': teleport.build_zones(self.space, compiled['teleportations']),
+        }
 
     def load_level(self, levelnumber=0):
         #The gravity resets for each level. 
         self.space.gravity = (0, -4.8)
 
         # Destroy any current game objects
-        for item in self.sugar_grains:
-            item.delete()  # Delete all sugar grains
+        self.sugar_grains.clear()  # Delete all sugar grains (parked in the pool for reuse)
+        # Pooled grains come back as new ones, so the moving bucket must not remember them
+        self.moving_bucket.collected_sugar.clear()
         for item in self.drawing_lines:
             item.delete() 
         for item in self.buckets:
             item.delete() 
         for item in self.statics:
             item.delete() 
-        self.sugar_grains = []
         self.drawing_lines = []  # Clear the list
         self.buckets = []
+        self.level_buckets = []
         self.statics = []
-        self.teleportation_zones = []
+        self.teleports.clear()
 
-        new_level = LEVEL_FILE_NAME.replace("X", str(levelnumber))
-        self.level = level.Level(new_level)
+        # Use the prefetched level if there is one, otherwise build it now
+        future = self.prefetched.pop(levelnumber, None)
+        prepared = future.result() if future else self.prepare_level(levelnumber)
+        self.prefetched.clear()  # Anything else was prepared for a level we are not loading
         
         # Make sure the file was found
-        if not self.level or not self.level.data:
+        if not prepared:
             return False
 
         else:  # Do final steps to start the level
+            self.level = prepared['level']
             self.level_grain_dropping = False
-            self.level_spout_position = (self.level.data['spout_x'], self.level.data['spout_y'])
-            self.build_main_walls()
-
-            if 'teleportations' in self.level.data:  # Ensure teleportations are defined in the JSON
-                for tp in self.level.data['teleportations']:
-                    self.teleportation_zones.append({
-                    'entry': (tp['entry'][0], tp['entry'][1]),  # x and y from entry list
-                    'exit': (tp['exit'][0], tp['exit'][1]),    # x and y from exit list 
-                    'radius': tp.get('entry_radius', 15)        # radius = 15 
-                })
-                print(f"Loaded teleportation zones: {self.teleportation_zones}") 
-           
-            # Load buckets
-            for nb in self.level.data['buckets']:
-                self.buckets.append(bucket.Bucket(self.space, nb['x'], nb['y'], nb['width'], nb['height'], nb['needed_sugar']))
-
-           #load statics 
-            for nb in self.level.data['statics']:
-                self.statics.append(static_item.StaticItem(self.space, nb['x1'], nb['y1'], nb['x2'], nb['y2'], nb['color'], nb['line_width'], nb['friction'], nb['restitution']))
+            self.level_spout_position = self.level.compiled['spout']
+
+            # Attach the prebuilt walls, statics, buckets and teleport zones
+            self.statics = prepared['statics']
+            for item in self.statics:
+                item.attach()
+            self.buckets = prepared['buckets']
+            for item in self.buckets:
+                item.attach()
+            self.level_buckets = list(self.buckets)  # Exploded buckets leave self.buckets, keep counting them
+            self.teleports.load(prepared['teleport_zones'])
             
             #Sugar count 
-            self.total_sugar_count = self.level.data['number_sugar_grains']
-            pg.time.set_timer(START_FLOW, 5 * 1000)  # 5 seconds
+            self.total_sugar_count = self.level.compiled['number_sugar_grains']
+            self.set_timer(START_FLOW, 5 * 1000)  # 5 seconds
             self.message_display.show_message("Level Up", 10)
             self.level_complete = False
-            self.total_sugar_count = self.level.data.get('number_sugar_grains', 0)  # Use 0 as fallback
+            # Allocate this level's grains now, so the spout only reuses pooled ones
+            self.sugar_grains.pool.reserve(self.total_sugar_count)
             self.sugar_used = 0  # Reset sugar used
 
             #Heads Up display when the level loads
             self.hud.update_level(self.current_level)
             self.hud.update_sugar_count(self.total_sugar, self.sugar_used, self.sugar_grains)   
+            self.invalidate_background()
+            self.publish_snapshot()  # Show the new level even before it is first stepped
             return True
         
 
     def build_main_walls(self):
-        '''Build the walls, ceiling, and floor of the screen'''
+        '''Build the walls, ceiling, and floor of the screen, not yet attached to the space'''
         # Floor
-        floor = static_item.StaticItem(self.space, 0, 0, WIDTH, 0, 'green', 5)
-        self.statics.append(floor)
+        floor = static_item.StaticItem(self.space, 0, 0, WIDTH, 0, 'green', 5, attach=False)
         # Left Wall
-        left_wall = static_item.StaticItem(self.space, 0, 0, 0, HEIGHT, 'green')
-        self.statics.append(left_wall)
+        left_wall = static_item.StaticItem(self.space, 0, 0, 0, HEIGHT, 'green', attach=False)
         # Right Wall
-        right_wall = static_item.StaticItem(self.space, WIDTH, 0, WIDTH, HEIGHT, 'green')
-        self.statics.append(right_wall)
+        right_wall = static_item.StaticItem(self.space, WIDTH, 0, WIDTH, HEIGHT, 'green', attach=False)
         # Ceiling
-        ceiling = static_item.StaticItem(self.space, 0, HEIGHT, WIDTH, HEIGHT, 'green')
-        self.statics.append(ceiling)
+        ceiling = static_item.StaticItem(self.space, 0, HEIGHT, WIDTH, HEIGHT, 'green', attach=False)
+        return [floor, left_wall, right_wall, ceiling]
     
     def check_all_buckets_exploded(self):
         """
@@ -178,6 +369,54 @@ class Game:
     def update(self):
         '''Update the program physics'''
     
+        # Calculate time since last frame
+        delta_time = self.clock.tick(FPS) / 1000.0  # Convert milliseconds to seconds
+        self.accumulator += delta_time
+        self.profiler.mark('idle')
+
+        if self.physics_worker:
+            self.update_caption()
+            return  # The physics thread keeps its own time
+
+        # Run as many fixed physics steps as the frame time covers, so the
+        # simulation keeps real-time speed whatever the render rate is
+        substeps = 0
+        while self.accumulator >= MAX_TIME_STEP and substeps < MAX_SUBSTEPS:
+            self.step(MAX_TIME_STEP)
+            self.accumulator -= MAX_TIME_STEP
+            substeps += 1
+
+        # After a very slow frame drop the backlog instead of spiralling to catch up
+        if self.accumulator >= MAX_TIME_STEP:
+            self.accumulator %= MAX_TIME_STEP
+
+        # Leftover fraction of a step, for interpolating positions when drawing
+        self.interpolation_alpha = self.accumulator / MAX_TIME_STEP
+
+        self.update_caption()
+
+    def update_caption(self):
+        '''Show the frame rate in the window caption.'''
+        # Setting the caption talks to the window manager, so not every frame
+        now = pg.time.get_ticks()
+        if now - self.caption_time >= CAPTION_INTERVAL:
+            pg.display.set_caption(f'fps: {self.clock.get_fps():.1f}')
+            self.caption_time = now
+
+    def step(self, time_step):
+        '''
+        Advance the game by one physics step of time_step seconds.
+
+        :param time_step: The physics time step in seconds.
+        '''
+        # Replays keyframe at these steps, the recording has to as well to stay in step with them
+        if self.recorder and self.step_count % REPLAY_SNAPSHOT_INTERVAL == 0:
+            self.keyframe()
+
+        # Timers keep running while paused, just like the wall clock does
+        self.sim_time += time_step
+        self.step_count += 1
+
         if self.is_paused or self.game_over:
             return 
        #When the level completes the HUD dissapers and when the level starts it reappears 
@@ -188,250 +427,529 @@ class Game:
 
         # Keep an overall iterator
         self.iter += 1
-        
-        # Calculate time since last frame
-        delta_time = self.clock.tick(FPS) / 1000.0  # Convert milliseconds to seconds
-
-        # Cap delta_time to prevent instability from large time steps
-        time_step = min(delta_time, MAX_TIME_STEP)
 
         # Step the physics simulation forward with the calculated time_step
         self.space.step(time_step)
+        self.step_profiler.mark('physics')
+
+        # Move grains that entered a teleport zone during the step
+        self.teleports.process()
+        # Take grains banked in a bucket during the step out of the physics, or back in
+        self.sugar_grains.process_settling()
+        self.moving_bucket.update()  # Stop at the screen edges
+
+        # One bulk copy of every grain's position and velocity for this step
+        self.sugar_grains.snapshot()
 
         
         # Update our game counter
         if self.iter == 60:
             self.iter = 0
 
-        pg.display.set_caption(f'fps: {self.clock.get_fps():.1f}')
-        for grain in self.sugar_grains:
-            grain.check_teleport() 
+        # Remove buckets that exploded during the step (the sensors count grains as they enter,
+        # see bucket.add_collection_handler). Every step, so they vanish from the background at once.
+        for i in range(len(self.buckets)-1, -1, -1):
+            bucket = self.buckets[i]
+            if bucket.exploded and bucket.count >= bucket.needed_sugar:
+                bucket.explode(self.sugar_grains)
+                del self.buckets[i]
+                self.invalidate_background()
+                # Check if all buckets exploded
+                if not self.level_complete and self.check_all_buckets_exploded():
+                    self.level_complete = True
+                    self.message_display.show_message("Level Complete!", 2)
+                    self.music.play_sound_effect("complete_level")
+                    self.set_timer(LOAD_NEW_LEVEL, 2000)  # Schedule next level load
+                    self.prefetch_level(self.current_level + 1)  # Build it while the message is up
+                    self.hud_visible = False
+        self.publish_snapshot()  # After the exploded buckets are gone
+        self.step_profiler.mark('collect')
             
         # Only do the following every 20 frames for less system stress
         if self.iter % 20 == 0:
             # Update any messages
             self.message_display.update()
-            
-            # Calculate buckets count by counting each grain's position
-            # First, explode or reset the counter on each bucket
-            for i in range(len(self.buckets)-1, -1, -1):
-                bucket = self.buckets[i]
-                if bucket.exploded and bucket.count >= bucket.needed_sugar:
-                    bucket.explode(self.sugar_grains)
-                    del self.buckets[i]
-                    # Check if all buckets exploded
-                    if not self.level_complete and self.check_all_buckets_exploded():
-                        self.level_complete = True
-                        self.message_display.show_message("Level Complete!", 2)
-                        self.music.channel4.play(pg.mixer.Sound("./music/Complete_level.wav"))
-                        pg.time.set_timer(LOAD_NEW_LEVEL, 2000)  # Schedule next level load
-                        self.hud_visible = False
-
-            # Count the grains in the un-exploded buckets
-            for grain in self.sugar_grains:
-                for bucket in self.buckets:
-                    bucket.collect(grain)
-    
-            # Collect for moving bucket
-            for grain in self.sugar_grains:
-                self.moving_bucket.collect(grain)
-
-            for grain in self.sugar_grains:
-                #Grains only teleport for level 2 
-                if self.current_level == 2:
-                    for tp in self.teleportation_zones:
-                        entry_x, entry_y = tp['entry']
-                        exit_x, exit_y = tp['exit']
-                        entry_radius = tp['radius']
-                        grain_x = grain.body.position.x
-                        grain_y = grain.body.position.y
-                
-                        # Calculate the distance from the grain to the entry point
-                        dx = grain_x - entry_x
-                        dy = grain_y - entry_y
-                        distance_to_entry = (dx**2 + dy**2) ** 0.5
-
-                        # If the sugar grain's entry radius, teleport the grain
-                        if distance_to_entry <= entry_radius:
-                            print(f"Teleporting grain to ({exit_x}, {exit_y})")
-                            grain.body.position = (exit_x, exit_y)
-                            grain.body.velocity = (0, 0)  # Reset motion
-                            self.space.reindex_shapes_for_body(grain.body)  
-                            break 
-                       
-
-                
+
             # Drop sugar if needed
             if self.level_grain_dropping and not self.game_over:
                 # Create new sugar to drop
-                new_sugar = Sugar_Grain(self.space, self.level_spout_position[0], self.level_spout_position[1], 0.1)
-                self.sugar_grains.append(new_sugar)
+                self.sugar_grains.spawn(self.level_spout_position[0], self.level_spout_position[1], 0.1)
                 # Check if it's time to stop
                 if len(self.sugar_grains) >= self.total_sugar_count:
                     self.level_grain_dropping = False
 
             #HUD for displaying the level while playing a level
             self.hud.update_level(self.current_level)
-
-
+        self.step_profiler.mark('spout')
+
+
+
+    def line_segments_left(self):
+        '''Return how many more line segments the level's budget allows the player to draw.'''
+        budget = self.level.compiled['line_segment_budget'] if self.level else LINE_SEGMENT_BUDGET
+        return budget - sum(len(line.segments) for line in self.drawing_lines)
+
+    def save_state(self):
+        '''
+        Return the simulation pickled into one bytes object, for restore_state().
+        Pymunk spaces pickle with their bodies, shapes, constraints and
+        collision handlers. A pickle is several times faster to make and load
+        than a copy.deepcopy() of the same objects, which keeps the
+        keyframes of a recording game from stalling the frame.
+        '''
+        state = {name: getattr(self, name) for name in self.SIMULATION_STATE}
+        return pickle.dumps(state, pickle.HIGHEST_PROTOCOL)
+
+    def restore_state(self, state):
+        '''
+        Go back to a state from save_state(). The state stays usable for later restores.
+
+        :param state: The saved state.
+        '''
+        for name, value in pickle.loads(state).items():
+            setattr(self, name, value)
+        self.hud.sugar_grains = self.sugar_grains  # The HUD counts the restored grains
+        self.sugar_grains.snapshot()  # The restored bodies have new ids, the snapshot rows must match them
+        self.prefetched.clear()
+        self.invalidate_background()
+        self.publish_snapshot()
+
+    def keyframe(self):
+        '''
+        Save the simulation and carry on from a copy of the save. Pymunk
+        does not restore its solver state exactly, so a copy only steps
+        exactly like another copy of the same save, never like the original. Recording
+        and replaying both keyframe at the same steps so seeks, replays and
+        the recording follow the same path.
+
+        :return: The saved state.
+        '''
+        state = self.save_state()
+        self.restore_state(state)
+        return state
+
+    def publish_snapshot(self):
+        '''
+        Hand draw() everything it draws as of now. With the physics thread on,
+        draw() reads only the snapshot, never the objects this thread changes.
+        '''
+        moving_outline = None
+        if self.current_level == 3 and not self.moving_bucket.exploded:  # Only level 3 shows the moving bucket
+            moving_outline = self.moving_bucket.screen_outline()
+        current_line = self.current_line
+        line_points = current_line.screen_points() if current_line is not None else ()
+        self.render_snapshots.publish(RenderSnapshot(self.sugar_grains.positions, self.sugar_grains.velocities,
+                                                     tuple(self.buckets), tuple(self.drawing_lines),
+                                                     tuple(self.statics), tuple(self.teleports.zones),
+                                                     self.moving_bucket, moving_outline, current_line, line_points,
+                                                     self.background_version))
+
+    def invalidate_background(self):
+        '''Throw away the cached static layer so the next draw() rebuilds it.'''
+        self.background_version += 1
+
+    def build_background(self, snapshot):
+        '''
+        Draw everything that only changes when a level loads, a line is
+        finished, or a bucket explodes onto its own surface.
+
+        :param snapshot: The RenderSnapshot to take the buckets, lines, statics and zones from.
+        '''
+        background = self.screen.copy()  # Same pixel format as the screen, so blits are plain copies
+        background.fill('dark green')
+
+        for bucket in snapshot.buckets:
+            bucket.draw(background)
+
+        # Draw the user-drawn lines
+        for line in snapshot.lines:
+            line.draw(background)
+
+        # Draw any static items
+        for static in snapshot.statics:
+            static.draw(background)
+
+        if not self.game_over and not self.level_complete and self.level_spout_position:
+                pg.draw.line(
+                    background, 
+                    (255, 165, 144), 
+                    (self.level_spout_position[0], HEIGHT - self.level_spout_position[1] - 10), 
+                    (self.level_spout_position[0], HEIGHT - self.level_spout_position[1]), 
+                    5
+                )
+
+        # Draw the teleport zones
+        for zone in snapshot.zones:
+            zone.draw(background)
+
+        return background
 
     def draw(self):
         '''Draw the overall game. Should call individual item draw() methods'''
-        # Clear the screen
-        self.screen.fill('dark green')
-    
+        live_rects = []  # Areas drawn by the live layer this frame
+        grain_rects = []  # Tiles where grains changed since last frame
 
         # Only show the intro screen if we haven't loaded a level yet
-        if self.intro_image:
-            self.screen.blit(self.intro_image, (0, 0)) 
+        if self.is_intro:
+            # Pick up the intro image once the loader thread has it
+            if self.intro_image is None and self.intro_future.done():
+                self.intro_image = self.intro_future.result().convert()  # Convert needs the display, so do it here
+                self.full_update = True
+            if self.full_update:
+                # Clear the screen
+                self.screen.fill('dark green')
+                if self.intro_image:
+                    self.screen.blit(self.intro_image, (0, 0)) 
+
         else: # Draw the intro image
-    
-            for bucket in self.buckets:
-                bucket.draw(self.screen)
+            snapshot = self.render_snapshots.latest()
+            if self.physics_worker:
+                alpha = snapshot.interpolation_alpha()  # How long ago the physics thread stepped
+            else:
+                alpha = self.interpolation_alpha
+
+            if self.background_built != snapshot.background_version:
+                self.background_built = snapshot.background_version
+                self.background = self.build_background(snapshot)
+                self.full_update = True
+
+            grain_positions = self.sugar_grains.screen_positions(alpha, snapshot.positions, snapshot.velocities)
+            grain_rects = self.sugar_grains.changed_rects(grain_positions)
+
+            # The static layer replaces clearing the screen
+            if self.full_update or not DIRTY_RECTS:
+                self.screen.blit(self.background, (0, 0))
+            else:
+                # Only erase what the live layer drew last frame and where grains changed
+                for rect in self.live_rects + grain_rects:
+                    self.screen.blit(self.background, rect, rect)
+            self.profiler.mark('background')
 
             #draw moving bucket for level 3 
-            if self.current_level == 3:
-                self.moving_bucket.draw(self.screen) 
+            if snapshot.moving_outline is not None:
+                live_rects.append(snapshot.moving_bucket.draw(self.screen, snapshot.moving_outline))
 
-            # Draw each sugar grain
-            for grain in self.sugar_grains:
-                grain.draw(self.screen)
+            # Draw every sugar grain in one pass, interpolated to the render time
+            self.sugar_grains.draw(self.screen, screen_positions=grain_positions)
+            self.profiler.mark('grains')
 
             # Draw the current dynamic line
-            if self.current_line is not None:
-                self.current_line.draw(self.screen)
-            
-            # Draw the user-drawn lines
-            for line in self.drawing_lines:
-                line.draw(self.screen)
-            
-                
-            # Draw any static items
-            for static in self.statics:
-                static.draw(self.screen)
-
-            if not self.game_over and not self.level_complete and self.level_spout_position:
-                    pg.draw.line(
-                        self.screen, 
-                        (255, 165, 144), 
-                        (self.level_spout_position[0], HEIGHT - self.level_spout_position[1] - 10), 
-                        (self.level_spout_position[0], HEIGHT - self.level_spout_position[1]), 
-                        5
-                    )
-
-            # Draw the nozzle (Remember to subtract y from the height)
-            for tp in self.teleportation_zones:
-                entry_x, entry_y = tp['entry']
-                exit_x, exit_y = tp['exit']
-                entry_radius = tp['radius']
-                
-                # Draw the entry square in blue
-                pg.draw.rect(self.screen, pg.Color('blue'), 
-                            pg.Rect(entry_x - entry_radius, HEIGHT - entry_y - entry_radius, 2 * entry_radius, 2 * entry_radius))
-                
-                # Draw the exit square in pink
-                pg.draw.rect(self.screen, pg.Color('pink'), 
-                            pg.Rect(exit_x - entry_radius, HEIGHT - exit_y - entry_radius, 2 * entry_radius, 2 * entry_radius))
-
+            if snapshot.current_line is not None:
+                live_rects.append(snapshot.current_line.draw(self.screen, snapshot.line_points))
 
             # Draw the heads-up display
             if not self.game_over and not self.level_complete:
 
             # Draw the heads-up display
-                self.hud.draw(self.buckets, [self.moving_bucket])
+                live_rects.extend(self.hud.draw(snapshot.buckets, [snapshot.moving_bucket]))
 
             # Show any messages needed        
-            self.message_display.draw(self.screen)
+            live_rects.append(self.message_display.draw(self.screen))
+
+            # Frame timings, when the profiler is on
+            live_rects.append(self.profiler.draw(self.screen, self.profiler_font, (WIDTH - 230, 40)))
+            live_rects = [rect for rect in live_rects if rect]
+            self.profiler.mark('overlay')
 
         # Update the display
-        pg.display.update()
+        if not self.headless:
+            if self.full_update or not DIRTY_RECTS:
+                pg.display.update()
+            else:
+                # Last frame's live areas have been erased, so they change too
+                pg.display.update(self.live_rects + grain_rects + live_rects)
+        self.profiler.mark('display')
+        self.live_rects = live_rects
+        self.full_update = False
+
+        self.record_startup_metric('time_to_first_frame')
+        if not self.is_intro:
+            self.record_startup_metric('time_to_interactive')
 
     def check_events(self):
         '''Check for keyboard and mouse events'''
-        for event in pg.event.get():
-            if event.type == EXIT_APP or event.type == pg.QUIT or (event.type == pg.KEYDOWN and event.key == pg.K_ESCAPE):
-                pg.quit()
-                sys.exit()
-
-            elif event.type == pg.KEYDOWN and event.key == pg.K_r: #restart 
-                    self.current_level -= 1
-                    self.message_display.show_message("Restart", 1)
-                    pg.time.set_timer(LOAD_NEW_LEVEL, 2000) 
+        if self.headless:
+            events = self.due_sim_events()  # No window, so only our own timers
+        else:
+            events = pg.event.get()
+        if self.physics_worker:
+            self.physics_worker.check()  # Re-raise anything that stopped the physics thread
+        for event in events:
+            if self.physics_worker and not self.is_local_event(event):
+                self.physics_worker.send(event)  # Game state belongs to the physics thread
+            else:
+                self.handle_event(event)
+        self.profiler.mark('events')
+
+    def is_local_event(self, event):
+        '''
+        Return True for events the main thread handles itself when physics
+        runs on its own thread: quitting, redraws and the profiler keys.
+
+        :param event: The pygame event.
+        '''
+        if event.type in (EXIT_APP, pg.QUIT, pg.WINDOWEXPOSED):
+            return True
+        return event.type == pg.KEYDOWN and event.key in (pg.K_ESCAPE, pg.K_F3, pg.K_F4)
+
+    def handle_event(self, event):
+        '''
+        Handle a single keyboard, mouse, or timer event.
+
+        :param event: The pygame event to handle.
+        '''
+        if self.recorder:
+            self.recorder.record(self.step_count, event, self.mouse_down)
+
+        if event.type == EXIT_APP or event.type == pg.QUIT or (event.type == pg.KEYDOWN and event.key == pg.K_ESCAPE):
+            if self.physics_worker:
+                self.physics_worker.stop()
+            if self.recorder:
+                self.recorder.close()
+                self.recorder = None
+            pg.quit()
+            sys.exit()
+
+        elif event.type == pg.WINDOWEXPOSED:
+            self.full_update = True  # The window contents were lost, push everything again
+
+        elif event.type == pg.KEYDOWN and event.key == pg.K_r: #restart 
+                self.current_level -= 1
+                self.message_display.show_message("Restart", 1)
+                self.set_timer(LOAD_NEW_LEVEL, 2000) 
+                self.prefetch_level(self.current_level + 1)
 
-                
+            
 
-            elif event.type == pg.KEYDOWN and event.key == pg.K_UP:
-                self.message_display.show_message("Reverse Gravity", 2)  # Show message for 2 seconds
-                self.space.gravity = (0, 4.8)
+        elif event.type == pg.KEYDOWN and event.key == pg.K_UP:
+            self.message_display.show_message("Reverse Gravity", 2)  # Show message for 2 seconds
+            self.space.gravity = (0, 4.8)
    
-            elif event.type == pg.KEYDOWN and event.key == pg.K_DOWN:
-                self.message_display.show_message("Normal Gravity ", 2)
-                self.space.gravity = (0, -4.8)
-               
-
-            elif event.type == pg.KEYDOWN and event.key == pg.K_SPACE:
-                self.is_paused = not self.is_paused #makes it the opposite 
-                self.message_display.show_message("Paused", 1)
-            
+        elif event.type == pg.KEYDOWN and event.key == pg.K_DOWN:
+            self.message_display.show_message("Normal Gravity ", 2)
+            self.space.gravity = (0, -4.8)
+           
+
+        elif event.type == pg.KEYDOWN and event.key == pg.K_F3:
+            self.profiler.toggle()
+
+        elif event.type == pg.KEYDOWN and event.key == pg.K_F4:
+            path = self.profiler.dump_csv()
+            print(f"Frame profile written to {path}")
+            self.message_display.show_message("Profile Saved", 2)
+
+        elif event.type == pg.KEYDOWN and event.key == pg.K_SPACE:
+            self.is_paused = not self.is_paused #makes it the opposite 
+            self.message_display.show_message("Paused", 1)
+        
     
 
 
-            elif event.type == pg.MOUSEBUTTONDOWN:
-                self.mouse_down = True
-                # Get mouse position and start a new dynamic line
-                mouse_x, mouse_y = pg.mouse.get_pos()
-                self.current_line = dynamic_item.DynamicItem(self.space, 'blue')
+        elif event.type == pg.MOUSEBUTTONDOWN:
+            self.mouse_down = True
+            # Get mouse position and start a new dynamic line, if the level's segment budget allows
+            mouse_x, mouse_y = event.pos
+            segments_left = self.line_segments_left()
+            if segments_left > 0:
+                self.current_line = dynamic_item.DynamicItem(self.space, 'blue', max_segments=segments_left)
                 self.current_line.add_vertex(mouse_x, mouse_y)
-                
-            elif event.type == pg.MOUSEBUTTONUP:
+                self.publish_snapshot()
+            else:
+                self.message_display.show_message("Out of ink!", 2)
+            
+        elif event.type == pg.MOUSEBUTTONUP:
+            self.mouse_down = False
+            if self.current_line:
+                self.current_line.finish()  # Simplify it, fewer segments for the grains to hit
+                self.drawing_lines.append(self.current_line)
+                self.current_line = None
+                self.invalidate_background()  # The finished line becomes part of the static layer
+                self.publish_snapshot()
+            
+        elif event.type == pg.MOUSEMOTION and self.mouse_down:
+            # Get mouse position
+            mouse_x, mouse_y = event.pos
+            if mouse_x == 0 or mouse_x == WIDTH or mouse_y == 0 or mouse_y == HEIGHT:
                 self.mouse_down = False
-                if self.current_line:
-                    self.drawing_lines.append(self.current_line)
-                    self.current_line = None
-                
-            elif event.type == pg.MOUSEMOTION and self.mouse_down:
-                # Get mouse position
-                mouse_x, mouse_y = pg.mouse.get_pos()
-                if mouse_x == 0 or mouse_x == WIDTH or mouse_y == 0 or mouse_y == HEIGHT:
-                    self.mouse_down = False
-                if self.current_line and self.iter % 10 == 0:
-                    self.current_line.add_vertex(mouse_x, mouse_y)
-
-            elif event.type == START_FLOW:
-                self.level_grain_dropping = True
-                # Disable the timer after the first trigger
-                pg.time.set_timer(START_FLOW, 0)
-                
-            elif event.type == LOAD_NEW_LEVEL:
-                pg.time.set_timer(LOAD_NEW_LEVEL, 0)  # Clear the timer
-                self.intro_image = None
-                self.is_intro = False  # Set to False when intro is done
-                self.current_level += 1
-                if not self.load_level(self.current_level):
-                    self.message_display.show_message("You Win!", 5)
-                    self.game_over = True 
-                    self.level_grain_dropping = False
-                    pg.time.set_timer(EXIT_APP, 5000)  # Quit game after 5 seconds
-                else:
-                    self.message_display.show_message(f"Level {self.current_level} Start!", 2)
-                    self.hud.update_level(self.current_level)
-
-    # Move the bucket based on arrow keys
-            elif event.type == pg.KEYDOWN and event.key == pg.K_LEFT: 
-                self.moving_bucket.move_bucket(dx=-10, dy=0)  # Move left
-
-            elif event.type == pg.KEYDOWN and event.key == pg.K_RIGHT:
-                    self.moving_bucket.move_bucket(dx=10, dy=0)  # Move right
+            if self.current_line and self.iter % 10 == 0:
+                if not self.current_line.add_vertex(mouse_x, mouse_y):
+                    self.message_display.show_message("Out of ink!", 2)
+                self.publish_snapshot()  # Show the line even while paused
+
+        elif event.type == START_FLOW:
+            self.level_grain_dropping = True
+            # Disable the timer after the first trigger
+            self.set_timer(START_FLOW, 0)
             
+        elif event.type == LOAD_NEW_LEVEL:
+            self.set_timer(LOAD_NEW_LEVEL, 0)  # Clear the timer
+            if self.is_intro:
+                self.finish_loading()
+            self.intro_image = None
+            self.is_intro = False  # Set to False when intro is done
+            self.current_level += 1
+            if not self.load_level(self.current_level):
+                self.message_display.show_message("You Win!", 5)
+                self.game_over = True 
+                self.invalidate_background()  # Hides the spout
+                self.publish_snapshot()
+                self.level_grain_dropping = False
+                self.set_timer(EXIT_APP, 5000)  # Quit game after 5 seconds
+            else:
+                self.message_display.show_message(f"Level {self.current_level} Start!", 2)
+                self.hud.update_level(self.current_level)
+
+        # Move the bucket while an arrow key is held
+        elif event.type in (pg.KEYDOWN, pg.KEYUP) and event.key in (pg.K_LEFT, pg.K_RIGHT):
+            direction = -1 if event.key == pg.K_LEFT else 1
+            self.moving_bucket.steer(direction, event.type == pg.KEYDOWN)
+        
     def run(self):
         '''Run the main game loop'''
         while True:
+            self.profiler.start_frame()
             self.check_events()
             self.update()
             self.draw()
+            self.profiler.end_frame()
+
+    def close(self):
+        '''Stop the physics thread and the loader threads, and finish the input log.'''
+        if self.physics_worker:
+            self.physics_worker.stop()
+        if self.recorder:
+            self.recorder.close()
+            self.recorder = None
+        self.level_loader.shutdown(wait=False, cancel_futures=True)
+        self.asset_loader.shutdown(wait=False, cancel_futures=True)
+
+    def run_headless(self, level, steps, inputs=(), stop_on_complete=True, sample_every=0):
+        '''
+        Run a level without a window as fast as the CPU allows, using a fixed
+        MAX_TIME_STEP per update instead of the frame clock.
+
+        :param level: The level number to load.
+        :param steps: The number of physics steps to simulate.
+        :param inputs: Iterable of (step, pygame event) pairs handled before that step.
+        :param stop_on_complete: Stop as soon as the level is complete.
+        :param sample_every: Record every bucket's count each this many steps, 0 for never.
+        :return: A dict of run statistics. The bucket figures cover the latest
+            load, after a restart (K_r) only the restarted level is counted.
+        '''
+        self.intro_image = None
+        self.is_intro = False
+        self.current_level = level
+        if not self.load_level(level):
+            raise ValueError(f"Level {level} could not be loaded")
+        fill_curves = []
+
+        scheduled = sorted(inputs, key=lambda item: item[0])
+        next_input = 0
+        completed_step = None
+        step = 0
+
+        start = time.perf_counter()
+        while step < steps and not self.game_over:
+            # Feed the scripted inputs due at this step
+            while next_input < len(scheduled) and scheduled[next_input][0] <= step:
+                self.handle_event(scheduled[next_input][1])
+                next_input += 1
+            self.check_events()
+            self.step(MAX_TIME_STEP)
+            step += 1
+            if sample_every and step % sample_every == 0:
+                # The buckets of the latest load, a restart or level change replaces them
+                fill_curves.append((step, [bucket.count for bucket in self.level_buckets]))
+
+            if self.level_complete and completed_step is None:
+                completed_step = step
+                if stop_on_complete:
+                    break
+        elapsed = time.perf_counter() - start
+
+        return {
+            'level': level,
+            'steps': step,
+            'sim_time': step * MAX_TIME_STEP,
+            'elapsed': elapsed,
+            'steps_per_second': step / elapsed if elapsed > 0 else float('inf'),
+            'grains': len(self.sugar_grains),
+            'bucket_counts': [bucket.count for bucket in self.buckets],
+            'teleports': self.teleports.total_hits(),
+            'grains_collected': sum(bucket.count for bucket in self.level_buckets),
+            'level_complete': self.level_complete,
+            'completed_step': completed_step,
+            'fill_curves': fill_curves,  # (step, [count per bucket]) pairs
+        }
+
+
+def run_headless(level, steps, inputs=(), seed=None, **options):
+    '''
+    Simulate a level headless (no window, null audio) and return its statistics.
+
+    :param level: The level number to load.
+    :param steps: The number of physics steps to simulate.
+    :param inputs: Iterable of (step, pygame event) pairs handled before that step.
+    :param seed: Seed for the game's random numbers, random when None.
+    :param options: Passed on to Game.run_headless().
+    '''
+    game = Game(headless=True, seed=seed)
+    try:
+        return game.run_headless(level, steps, inputs, **options)
+    finally:
+        game.close()
+
+def replay_log(path, to_step=None):
+    '''
+    Re-simulate a recorded input log headless at full speed and return its statistics.
+
+    :param path: The log written with --record.
+    :param to_step: Stop at this step instead of after the last input.
+    '''
+    seed, inputs = read_log(path)
+    game = Game(headless=True, seed=seed)
+    try:
+        player = ReplayPlayer(game, inputs)
+        start = time.perf_counter()
+        if to_step is None:
+            player.run_to_end()
+        else:
+            player.seek(to_step)
+        elapsed = time.perf_counter() - start
+        return {
+            'level': game.current_level,
+            'steps': game.step_count,
+            'inputs': len(inputs),
+            'elapsed': elapsed,
+            'grains': len(game.sugar_grains),
+            'bucket_counts': [bucket.count for bucket in game.buckets],
+            'level_complete': game.level_complete,
+        }
+    finally:
+        game.close()
 
 def main():
-    game = Game()
+    parser = argparse.ArgumentParser(description="Sugar Pop")
+    parser.add_argument('--headless', type=int, metavar='LEVEL',
+                        help="simulate LEVEL without a window and print the run statistics")
+    parser.add_argument('--steps', type=int, default=FPS * 60,
+                        help="number of physics steps to simulate in headless mode")
+    parser.add_argument('--physics-thread', action='store_true', default=PHYSICS_THREAD,
+                        help="step the physics on its own thread")
+    parser.add_argument('--seed', type=int, help="seed for the game's random numbers")
+    parser.add_argument('--record', metavar='FILE', help="record all input to FILE for --replay")
+    parser.add_argument('--replay', metavar='FILE', help="re-simulate a recorded game headless and print its statistics")
+    parser.add_argument('--to-step', type=int, help="with --replay, stop at this physics step")
+    args = parser.parse_args()
+
+    if args.headless is not None:
+        print(run_headless(args.headless, args.steps))
+        return
+    if args.replay:
+        print(replay_log(args.replay, args.to_step))
+        return
+
+    game = Game(physics_thread=args.physics_thread, seed=args.seed, record=args.record)
     game.run()
 
 if __name__ == '__main__':
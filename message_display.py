@@ -8,9 +8,10 @@
 
 import pygame as pg
 import time
+from text_cache import text_cache
 
 class MessageDisplay:
-    def __init__(self, font_name=None, font_size=36, color=(255, 255, 255)):
+    def __init__(self, font_name=None, font_size=36, color=(255, 255, 255), font=None):
         """
         Initialize the MessageDisplay class.
         
@@ -18,8 +19,12 @@ class MessageDisplay:
         :param font_name: The name of the font (default is None, which uses the default font).
         :param font_size: The size of the font.
         :param color: The color of the text (default is white).
+        :param font: An already loaded font. If None, one is loaded from font_name
+            and font_size the first time a message is drawn.
         """
-        self.font = pg.font.SysFont(font_name, font_size)
+        self.font = font
+        self.font_name = font_name
+        self.font_size = font_size
         self.color = color
         self.message = None
         self.display_until = 0
@@ -44,8 +49,13 @@ class MessageDisplay:
     def draw(self, screen):
         """
         Draw the message on the screen, if there is an active message.
+
+        :return: The area drawn, or None if there was no message.
         """
         if self.message and screen:
-            text_surface = self.font.render(self.message, True, self.color)
+            if self.font is None:
+                self.font = pg.font.SysFont(self.font_name, self.font_size)
+            text_surface = text_cache.render(self.font, self.message, self.color)
             text_rect = text_surface.get_rect(center=(screen.get_width() // 2, screen.get_height() // 2))
-            screen.blit(text_surface, text_rect)
+            return screen.blit(text_surface, text_rect)
+        return None
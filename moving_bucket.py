@@ -9,95 +9,95 @@
 import pygame as pg
 import pymunk
 from settings import SCALE, HEIGHT, WIDTH
-from music import Music
-from math import sqrt
+from music import play_sound_effect
+from bucket import make_sensor, to_pygame, BUCKET_COLOR
+
+# Speed of the bucket while an arrow key is held, in Pymunk units per second (240 px/s)
+SPEED = 240 / SCALE
+
 
 class MovingBucket:
     def __init__(self, space, x, y, width, height, needed_sugar):
-        self.music = Music()
+        """
+        A bucket on a kinematic body that slides left and right while an
+        arrow key is held. The walls and sensor are attached to the body, so
+        they move with it without being rebuilt and push grains as they go.
+
+        :param space: The Pymunk space the bucket belongs to.
+        :param x, y: Center of the bucket in Pygame screen coordinates (y down).
+        :param width, height: Size of the bucket in Pygame units.
+        :param needed_sugar: Grains to collect before the bucket explodes.
+        """
         self.space = space
         self.width = width / SCALE
         self.height = height / SCALE
         self.count = 0  # Counter for collected sugar grains
         self.needed_sugar = needed_sugar
-        self.collected_sugar = []
-        self.grain_constraints = [] 
+        self.collected_sugar = set()  # Every grain counted so far
+        self.direction = 0  # -1 left, 1 right, 0 standing still
 
-        # Convert Pygame coordinates to Pymunk coordinates
-        self.x = x
-        self.y = HEIGHT - y  # Adjust for Pygame/Y-axis inversion
+        # Kinematic: moved by its velocity, never by collisions
+        self.body = pymunk.Body(body_type=pymunk.Body.KINEMATIC)
+        self.body.position = x / SCALE, (HEIGHT - y) / SCALE  # Adjust for Pygame/Y-axis inversion
 
-        self.width = width / SCALE
-        self.height = height / SCALE
-
-    
-        """Create or update the walls of the bucket based on its current position."""
+        # Walls in body coordinates, around the body's position
         wall_thickness = 0.2  # Thickness of the walls in physics units
-        x_pymunk = self.x / SCALE
-        y_pymunk = self.y / SCALE
-
-        # Left wall
-        left_wall_start = (x_pymunk - self.width / 2, y_pymunk - self.height / 2)
-        left_wall_end = (x_pymunk - self.width / 2, y_pymunk + self.height / 2)
-        self.left_wall = pymunk.Segment(self.space.static_body, left_wall_start, left_wall_end, wall_thickness)
-        self.left_wall.friction = 0.5
-        self.left_wall.elasticity = 0.5
-        self.space.add(self.left_wall)
-
-        # Right wall
-        right_wall_start = (x_pymunk + self.width / 2, y_pymunk - self.height / 2)
-        right_wall_end = (x_pymunk + self.width / 2, y_pymunk + self.height / 2)
-        self.right_wall = pymunk.Segment(self.space.static_body, right_wall_start, right_wall_end, wall_thickness)
-        self.right_wall.friction = 0.5
-        self.right_wall.elasticity = 0.5
-        self.space.add(self.right_wall)
-
-        # Bottom wall
-        bottom_wall_start = (x_pymunk - self.width / 2, y_pymunk - self.height / 2)
-        bottom_wall_end = (x_pymunk + self.width / 2, y_pymunk - self.height / 2)
-        self.bottom_wall = pymunk.Segment(self.space.static_body, bottom_wall_start, bottom_wall_end, wall_thickness)
-        self.bottom_wall.friction = 0.5
-        self.bottom_wall.elasticity = 0.5
-        self.space.add(self.bottom_wall)
+        half_width = self.width / 2
+        half_height = self.height / 2
+        self.left_wall = pymunk.Segment(self.body, (-half_width, -half_height), (-half_width, half_height), wall_thickness)
+        self.right_wall = pymunk.Segment(self.body, (half_width, -half_height), (half_width, half_height), wall_thickness)
+        self.bottom_wall = pymunk.Segment(self.body, (-half_width, -half_height), (half_width, -half_height), wall_thickness)
+        for wall in (self.left_wall, self.right_wall, self.bottom_wall):
+            wall.friction = 0.5
+            wall.elasticity = 0.5
+
+        # Interior sensor, grains entering it are collected
+        self.sensor = make_sensor(self.body, -half_width, half_width, -half_height, half_height, self)
+        self.space.add(self.body, self.left_wall, self.right_wall, self.bottom_wall, self.sensor)
+
+        # Screen outline, open at the top, and the body position it was converted at
+        self.outline = None
+        self.outline_at = None
+
+        # How far the center may go before the bucket leaves the screen
+        self.min_x = half_width
+        self.max_x = WIDTH / SCALE - half_width
 
         self.exploded = False  # Track if the bucket has exploded
 
-    def move_bucket(self, dx, dy):
-        """Move the bucket by the given dx, dy values and update its walls."""
-        if self.exploded:
-            return  # Do not move if the bucket has exploded
+    @property
+    def x(self):
+        """Center x in Pygame units."""
+        return self.body.position.x * SCALE
 
-        # Update bucket position
-        self.x += dx
-        self.y += dy
+    @property
+    def y(self):
+        """Center y in Pygame units, measured up from the bottom of the screen."""
+        return self.body.position.y * SCALE
 
-        # Remove the old walls
-        self.space.remove(self.left_wall, self.right_wall, self.bottom_wall)
-
-        # Create new walls based on the updated position
-        wall_thickness = 0.2  # Thickness of the walls in physics units
-        x_pymunk = self.x / SCALE
-        y_pymunk = self.y / SCALE
-
-        # Left wall
-        left_wall_start = (x_pymunk - self.width / 2, y_pymunk - self.height / 2)
-        left_wall_end = (x_pymunk - self.width / 2, y_pymunk + self.height / 2)
-        self.left_wall = pymunk.Segment(self.space.static_body, left_wall_start, left_wall_end, wall_thickness)
-
-        # Right wall
-        right_wall_start = (x_pymunk + self.width / 2, y_pymunk - self.height / 2)
-        right_wall_end = (x_pymunk + self.width / 2, y_pymunk + self.height / 2)
-        self.right_wall = pymunk.Segment(self.space.static_body, right_wall_start, right_wall_end, wall_thickness)
+    def steer(self, direction, pressed):
+        """
+        Follow the arrow keys: move while one is held, stop when it is released.
 
-        # Bottom wall
-        bottom_wall_start = (x_pymunk - self.width / 2, y_pymunk - self.height / 2)
-        bottom_wall_end = (x_pymunk + self.width / 2, y_pymunk - self.height / 2)
-        self.bottom_wall = pymunk.Segment(self.space.static_body, bottom_wall_start, bottom_wall_end, wall_thickness)
+        :param direction: -1 for the left arrow, 1 for the right arrow.
+        :param pressed: True when the key went down, False when it came up.
+        """
+        if pressed:
+            self.direction = direction
+        elif direction == self.direction:
+            self.direction = 0  # Releasing the other key keeps the current one going
+        if not self.exploded:
+            self.body.velocity = (self.direction * SPEED, 0)
 
-        # Add the new walls back into the space
-        self.space.add(self.left_wall, self.right_wall, self.bottom_wall)
+    def update(self):
+        """Stop at the screen edges. Call after every space.step()."""
+        if self.exploded or not self.direction:
+            return
+        x, y = self.body.position
+        if x < self.min_x or x > self.max_x:
+            self.body.position = min(max(x, self.min_x), self.max_x), y
+            self.body.velocity = (0, 0)
 
-    
     def get_collected_count(self):
         """Return the number of sugar grains collected in this bucket."""
         return self.count
@@ -107,95 +107,78 @@ class MovingBucket:
         if self.exploded:
             return  # Prevent multiple explosions
 
-        # Get the bucket's center position
-        bucket_center_x = (self.left_wall.a[0] + self.right_wall.a[0]) / 2
-        bucket_center_y = (self.left_wall.a[1] + self.left_wall.b[1]) / 2
-
-        # Apply radial force to each grain
-        for grain in grains:
-            grain_pos = grain.body.position
-            dx = grain_pos.x - bucket_center_x
-            dy = grain_pos.y - bucket_center_y
-            distance = sqrt(dx**2 + dy**2)
-
-            if distance < 2:  # Only affect grains within a certain radius
-                if distance > 0:
-                    dx /= distance
-                    dy /= distance
-
-                # Apply a radial impulse (adjust magnitude as needed)
-                impulse_magnitude = 20 / (distance + 0.1)
-                impulse = (dx * impulse_magnitude, dy * impulse_magnitude)
-                grain.body.apply_impulse_at_world_point(impulse, grain.body.position)
-
-        # Remove constraints
-        for constraint in self.grain_constraints:
-            self.space.remove(constraint)
-        self.grain_constraints.clear()
+        # Apply a radial impulse to grains within a certain radius of the bucket's center
+        grains.apply_radial_impulse(tuple(self.body.position), 2, 20)
 
         # Remove the bucket walls
-        self.space.remove(self.left_wall, self.right_wall, self.bottom_wall)
+        self.space.remove(self.body, self.left_wall, self.right_wall, self.bottom_wall, self.sensor)
+        self.body.velocity = (0, 0)
         self.exploded = True
 
-    def draw(self, screen):
-        """Draw the bucket with an open top on the Pygame screen."""
-        if self.exploded:
-            return
-
-        color = (144, 238, 144)  # Light green color
+    def screen_outline(self):
+        """
+        Return the open-top outline in screen coordinates, converted only after the body has moved.
+        The list is replaced rather than changed, so another thread can keep drawing it.
+        """
+        position = self.body.position
+        if self.outline_at != position:
+            self.outline = [to_pygame(self.body.local_to_world(p)) for p in
+                            (self.left_wall.b, self.left_wall.a, self.right_wall.a, self.right_wall.b)]
+            self.outline_at = position
+        return self.outline
+
+    def draw(self, screen, outline=None):
+        """
+        Draw the bucket with an open top on the Pygame screen.
 
-        # Helper function to convert Pymunk coordinates to Pygame coordinates
-        def to_pygame(p):
-            return int(p[0] * SCALE), int(HEIGHT - p[1] * SCALE)
+        :param outline: Outline from screen_outline() to draw. Defaults to the current one.
+        :return: The area drawn, or None.
+        """
+        if outline is None:
+            if self.exploded:
+                return None
+            outline = self.screen_outline()
 
         # Draw the bucket edges
-        pg.draw.line(screen, color, to_pygame(self.left_wall.a), to_pygame(self.left_wall.b), 2)
-        pg.draw.line(screen, color, to_pygame(self.right_wall.a), to_pygame(self.right_wall.b), 2)
-        pg.draw.line(screen, color, to_pygame(self.bottom_wall.a), to_pygame(self.bottom_wall.b), 2)
+        return pg.draw.lines(screen, BUCKET_COLOR, False, outline, 2)
 
     def count_reset(self):
         """Reset the collected count."""
         if not self.exploded:
             self.count = 0
 
-    def collect(self, sugar_grain):
+    def grain_entered(self, sugar_grain, grains):
+        """Sensor callback: a grain started overlapping the bucket interior."""
+        self.collect(sugar_grain, grains)
+
+    def collect(self, sugar_grain, grains):
         """
-        Check if a sugar grain is within the bucket bounds and, if so, increase the bucket's count.
+        Count a sugar grain that entered the bucket.
+        Called from the interior sensor's collision callback.
         
-        :param sugar_grain: The sugar grain to check.
+        :param sugar_grain: The sugar grain to collect.
+        :param grains: The GrainSystem, pushed apart if the bucket explodes.
         :return: True if the grain was collected, False otherwise.
         """
         if self.exploded:
-            return  # Don't count grains if the bucket has exploded
-
-        # Get the grain's position
-        grain_pos = sugar_grain.body.position
-
-        # Calculate the bucket boundaries using the wall positions
-        left = self.left_wall.a[0]  # x-coordinate of the left wall
-        right = self.right_wall.a[0]  # x-coordinate of the right wall
-        bottom = self.bottom_wall.a[1]  # y-coordinate of the bottom wall
-        top = self.left_wall.b[1]  # y-coordinate of the top of the left wall
+            return False  # Don't count grains if the bucket has exploded
 
-        # Check if the grain's position is within the bucket's bounding box
-        if left <= grain_pos.x <= right and bottom <= grain_pos.y <= top:
-            if sugar_grain not in self.collected_sugar:  # Avoid double-collecting
-                self.collected_sugar.append(sugar_grain)
-                self.count += 1  # Increase count
-                self.music.play_sound_effect("add_ball")  # Play sound effect
+        if sugar_grain in self.collected_sugar:  # Avoid double-collecting
+            return False
 
-                # Check if the bucket should explode
-                if self.count >= self.needed_sugar and not self.exploded:
-                    self.explode(self.collected_sugar)  # Trigger explosion
-                    self.music.play_sound_effect("bucket")
-                      # Play explosion sound
-                return True  # Indicate successful collection
+        self.collected_sugar.add(sugar_grain)
+        self.count += 1  # Increase count
+        play_sound_effect("add_ball")  # Play sound effect
 
-        return False
+        # Check if the bucket should explode
+        if self.count >= self.needed_sugar and not self.exploded:
+            self.explode(grains)  # Trigger explosion
+            play_sound_effect("bucket")  # Play explosion sound
+        return True  # Indicate successful collection
 
 
     def delete(self):
         """Delete the bucket and its walls."""
         if not self.exploded:
-            self.space.remove(self.left_wall, self.right_wall, self.bottom_wall)
+            self.space.remove(self.body, self.left_wall, self.right_wall, self.bottom_wall, self.sensor)
             self.exploded = True
@@ -2,56 +2,119 @@
 # Module Name: Sugar Pop Dynamic Item Module
 # Project: Sugar Pop Program
 # Date: Dec 6, 2024
-# By: Eyasu Smieja 
+# By: Eyasu Smieja
 # Description: The music item of the sugar pop game
 #############################################################
 
-import pygame as pg 
+import pygame as pg
 from pygame import mixer
 
 
-class Music:
-    def __init__(self):
-        # Initialize Pygame mixer
-        pg.init()
+# The background track is streamed from disk by pg.mixer.music, never decoded into memory
+BACKGROUND_TRACK = "./music/Game.mp3"
+
+# Sound effect files by key
+SOUND_FILES = {
+    "bucket": "./music/Explosion_Sound.wav",
+    "add_ball": "./music/Add_ball.wav",
+    "complete_level": "./music/Complete_level.wav",
+    "failed_level": "./music/Failed_level.wav",
+}
+
+# Mixer channel each sound plays on
+SOUND_CHANNELS = {
+    "bucket": 1,          # Channel 1 for bucket sound
+    "add_ball": 2,        # Channel 2 for add ball sound
+    "complete_level": 3,  # Channel 3 for Complete level sound
+    "failed_level": 4,    # Channel 4 for Failed level sound
+}
+
+# Process-wide cache of decoded sounds. Each file is loaded once, the first time it is played.
+_sounds = {}
+
+
+def init_mixer():
+    """Initialize the Pygame mixer if nobody has yet."""
+    if not pg.mixer.get_init():
         pg.mixer.init()
 
-        self.music_songs = {
-            "background": pg.mixer.Sound("./music/Game.mp3"),
-            "bucket": pg.mixer.Sound("./music/Explosion_Sound.wav"),
-            "add_ball": pg.mixer.Sound("./music/Add_ball.wav"),
-            "complete_level": pg.mixer.Sound("./music/Complete_level.wav"),
-            "failed_level": pg.mixer.Sound("./music/Failed_level.wav"),
-        }
+
+def get_sound(key):
+    """
+    Return the decoded sound for key, loading it on first use.
+
+    :param key: One of the SOUND_FILES keys.
+    :return: The shared pg.mixer.Sound, or None for an unknown key.
+    """
+    sound = _sounds.get(key)
+    if sound is None and key in SOUND_FILES:
+        init_mixer()
+        sound = pg.mixer.Sound(SOUND_FILES[key])
+        _sounds[key] = sound
+    return sound
+
+
+def preload_sounds():
+    """Decode every sound effect now, so the first time one plays does not stall."""
+    for key in SOUND_FILES:
+        get_sound(key)
+
+
+def play_background(loops=-1):
+    """
+    Stream the background track. pg.mixer.music decodes it in small chunks
+    as it plays, separately from the effect channels.
+
+    :param loops: Number of repeats, -1 loops forever.
+    """
+    init_mixer()
+    pg.mixer.music.load(BACKGROUND_TRACK)
+    pg.mixer.music.play(loops)
+
+
+def stop_background():
+    """Stop the streamed background track."""
+    if pg.mixer.get_init():
+        pg.mixer.music.stop()
+
+
+def play_sound_effect(key):
+    """
+    Play a sound on its own channel.
+
+    :param key: One of the SOUND_FILES keys.
+    """
+    sound = get_sound(key)
+    if sound:
+        pg.mixer.Channel(SOUND_CHANNELS[key]).play(sound)
+
+
+class Music:
+    def __init__(self):
+        # Initialize Pygame mixer. Sounds come from the shared cache, so this is cheap.
+        init_mixer()
 
         # channels
-        self.channel1 = pg.mixer.Channel(0)  # Channel 0 for background music
+        self.channel1 = pg.mixer.Channel(0)  # Channel 0 is free, background music is streamed
         self.channel2 = pg.mixer.Channel(1)  # Channel 1 for bucket sound
         self.channel3 = pg.mixer.Channel(2)  # Channel 2 for add ball sound
         self.channel4 = pg.mixer.Channel(3)  # Channel 3 for Complete level sound
         self.channel5 = pg.mixer.Channel(4)  # Channel 4 for Failed level sound
-    
+
     def play(self, key):
         """Play looping background music."""
-        sound = self.music_songs.get(key)
+        if key == "background":
+            play_background()  # Loop background music indefinitely
+            return
+        sound = get_sound(key)
         if sound:
-            self.channel1.play(sound, loops=0)  # Loop background music indefinitely
+            self.channel1.play(sound, loops=0)
 
     def stop(self):
         """Stop the background music."""
+        stop_background()
         self.channel1.stop()
 
     def play_sound_effect(self, key):
         """Play sound effects on their respective channels."""
-        sound = self.music_songs.get(key)
-        if sound:
-            # Assign appropriate channels for specific sound effects
-            if key == "bucket":
-                self.channel2.play(sound)
-            elif key == "add_ball":
-                self.channel3.play(sound)
-            elif key == "complete_level":
-                self.channel4.play(sound)
-            elif key == "failed_level":
-                self.channel5.play(sound)
-
+        play_sound_effect(key)
@@ -0,0 +1,143 @@
+#############################################################
+# Module Name: Sugar Pop Physics Worker Module
+# Project: Sugar Pop Program
+# Date: Oct 18, 2026
+# By: Eyasu Smieja
+# Description: Runs the physics on its own thread, apart from drawing
+#############################################################
+
+import queue
+import threading
+import time
+from settings import MAX_TIME_STEP, MAX_SUBSTEPS
+
+
+class RenderSnapshot:
+    __slots__ = ('time', 'positions', 'velocities', 'buckets', 'lines', 'statics', 'zones',
+                 'moving_bucket', 'moving_outline', 'current_line', 'line_points', 'background_version')
+
+    def __init__(self, positions, velocities, buckets, lines, statics=(), zones=(),
+                 moving_bucket=None, moving_outline=None, current_line=None, line_points=(),
+                 background_version=0):
+        """
+        What draw() needs from one physics step. Never changed once published.
+
+        :param positions: Grain positions array from GrainSystem.snapshot(), Pymunk units.
+        :param velocities: Grain velocities array, same rows as positions.
+        :param buckets: Tuple of the buckets still standing.
+        :param lines: Tuple of the finished user-drawn lines.
+        :param statics: Tuple of the level's StaticItems.
+        :param zones: Tuple of the level's TeleportZones.
+        :param moving_bucket: The MovingBucket, for the HUD.
+        :param moving_outline: Its screen outline from screen_outline(), or None when it is not drawn.
+        :param current_line: The line being drawn, or None.
+        :param line_points: Its screen points from screen_points().
+        :param background_version: The game's background_version, so the static layer
+            is rebuilt from the snapshot that has the change.
+        """
+        self.time = time.perf_counter()  # When the step finished, for interpolation
+        self.positions = positions
+        self.velocities = velocities
+        self.buckets = buckets
+        self.lines = lines
+        self.statics = statics
+        self.zones = zones
+        self.moving_bucket = moving_bucket
+        self.moving_outline = moving_outline
+        self.current_line = current_line
+        self.line_points = line_points
+        self.background_version = background_version
+
+    def interpolation_alpha(self):
+        """Return how far (0-1) into the next physics step the current time is."""
+        return min(max((time.perf_counter() - self.time) / MAX_TIME_STEP, 0.0), 1.0)
+
+
+class SnapshotBuffer:
+    def __init__(self, snapshot=None):
+        """
+        Double buffer of RenderSnapshots. The physics side fills the back
+        slot and swaps, so the drawing side always gets a whole snapshot.
+
+        :param snapshot: The snapshot to start with.
+        """
+        self.slots = [snapshot, snapshot]
+        self.front = 0
+        self.lock = threading.Lock()
+
+    def publish(self, snapshot):
+        """Make snapshot the one latest() returns."""
+        back = 1 - self.front
+        self.slots[back] = snapshot
+        with self.lock:
+            self.front = back
+
+    def latest(self):
+        """Return the newest published snapshot."""
+        with self.lock:
+            return self.slots[self.front]
+
+
+class PhysicsWorker:
+    def __init__(self, game):
+        """
+        Step a game's physics on a thread at the fixed MAX_TIME_STEP rate.
+        Input events are queued with send() and handled on the thread
+        between steps, so only this thread touches the space. Pymunk
+        releases the GIL while stepping, so drawing overlaps with it.
+
+        :param game: The Game to step. Its handle_event() and step() run on this thread.
+        """
+        self.game = game
+        self.events = queue.SimpleQueue()
+        self.running = False
+        self.error = None  # Exception that stopped the thread, re-raised by check()
+        self.thread = threading.Thread(target=self.run, name="physics", daemon=True)
+
+    def start(self):
+        """Start stepping."""
+        self.running = True
+        self.thread.start()
+
+    def stop(self):
+        """Stop stepping and wait for the thread to finish. Call from the main thread."""
+        self.running = False
+        self.events.put(None)  # Wake the thread if it is waiting for input
+        if self.thread.is_alive():
+            self.thread.join()
+
+    def send(self, event):
+        """Queue an input event for the physics thread."""
+        self.events.put(event)
+
+    def check(self):
+        """Raise the exception that stopped the thread, if any."""
+        if self.error is not None:
+            raise self.error
+
+    def run(self):
+        """Thread body: handle queued events, then run the steps that are due."""
+        try:
+            next_step = time.perf_counter()
+            while self.running:
+                # Wait for input until the next step is due
+                timeout = next_step - time.perf_counter()
+                try:
+                    event = self.events.get(timeout=timeout) if timeout > 0 else self.events.get_nowait()
+                    while event is not None:
+                        self.game.handle_event(event)
+                        event = self.events.get_nowait()
+                except queue.Empty:
+                    pass
+
+                substeps = 0
+                while time.perf_counter() >= next_step and substeps < MAX_SUBSTEPS:
+                    self.game.step(MAX_TIME_STEP)
+                    next_step += MAX_TIME_STEP
+                    substeps += 1
+
+                # After a very slow step drop the backlog instead of spiralling to catch up
+                if time.perf_counter() >= next_step + MAX_TIME_STEP:
+                    next_step = time.perf_counter()
+        except Exception as e:
+            self.error = e
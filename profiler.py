@@ -0,0 +1,147 @@
+#############################################################
+# Module Name: Sugar Pop Profiler Module
+# Project: Sugar Pop Program
+# Date: Oct 18, 2026
+# By: Eyasu Smieja
+# Description: Per-phase frame timings with an on-screen overlay
+#############################################################
+
+import csv
+import time
+import numpy as np
+import pygame as pg
+from settings import PROFILER_FRAMES
+
+# Frame phases, in the order a frame runs them
+PHASES = (
+    'events',      # Event polling and handling
+    'idle',        # Waiting in clock.tick() for the frame rate cap
+    'physics',     # space.step()
+    'collect',     # Teleports, grain snapshot, exploded buckets
+    'spout',       # Spout, messages and the other every-20-steps work
+    'background',  # Building, blitting or erasing the static layer
+    'grains',      # Drawing the grains
+    'overlay',     # Moving bucket, current line, HUD, messages, this overlay
+    'display',     # display.update()
+)
+PHASE_INDEX = {phase: i for i, phase in enumerate(PHASES)}
+
+# Seconds between overlay text refreshes, so it stays readable and cheap
+OVERLAY_INTERVAL = 0.25
+
+
+class FrameProfiler:
+    def __init__(self, capacity=PROFILER_FRAMES):
+        """
+        Time each phase of a frame into a ring buffer of the last frames.
+        Call start_frame(), then mark(phase) as each phase ends, then end_frame().
+        Every call returns at once while the profiler is off.
+
+        :param capacity: Number of frames kept.
+        """
+        self.enabled = False
+        self.samples = np.zeros((capacity, len(PHASES)))  # Seconds per phase, one row per frame
+        self.count = 0  # Frames recorded, the newest is at (count - 1) % capacity
+        self.current = [0.0] * len(PHASES)
+        self.last = 0.0
+
+        self.overlay = None  # Rendered overlay, refreshed every OVERLAY_INTERVAL
+        self.overlay_time = 0.0
+
+    def toggle(self):
+        """Turn profiling on or off. Turning it on starts from an empty buffer."""
+        self.enabled = not self.enabled
+        self.count = 0
+        self.overlay = None
+        self.current = [0.0] * len(PHASES)
+        self.last = time.perf_counter()
+
+    def start_frame(self):
+        """Start timing a frame."""
+        if not self.enabled:
+            return
+        self.last = time.perf_counter()
+
+    def mark(self, phase):
+        """
+        Add the time since the last mark to phase. Phases marked more than
+        once in a frame, like physics over several substeps, add up.
+
+        :param phase: One of PHASES.
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.current[PHASE_INDEX[phase]] += now - self.last
+        self.last = now
+
+    def end_frame(self):
+        """Store the frame's timings in the ring buffer."""
+        if not self.enabled:
+            return
+        self.samples[self.count % len(self.samples)] = self.current
+        self.count += 1
+        self.current = [0.0] * len(PHASES)
+
+    def recorded(self):
+        """Return the recorded frames, oldest first, as an array of seconds."""
+        capacity = len(self.samples)
+        if self.count <= capacity:
+            return self.samples[:self.count]
+        return np.roll(self.samples, -(self.count % capacity), axis=0)
+
+    def percentiles(self):
+        """
+        Return the p50 and p99 of each phase and of the whole frame.
+
+        :return: List of (name, p50 ms, p99 ms), with 'frame' last.
+        """
+        frames = self.recorded()
+        if not len(frames):
+            return []
+        # Add a total column, so the frame percentiles come from whole frames
+        frames = np.column_stack((frames, frames.sum(axis=1))) * 1000
+        p50, p99 = np.percentile(frames, (50, 99), axis=0)
+        return list(zip(PHASES + ('frame',), p50.tolist(), p99.tolist()))
+
+    def draw(self, screen, font, position):
+        """
+        Draw the p50/p99 table.
+
+        :param screen: The Pygame surface to draw on.
+        :param font: The font for the table.
+        :param position: Top-left corner of the table.
+        :return: The area drawn, or None when off.
+        """
+        if not self.enabled:
+            return None
+
+        now = time.perf_counter()
+        if self.overlay is None or now - self.overlay_time >= OVERLAY_INTERVAL:
+            lines = [f"{'phase':<11}{'p50':>7}{'p99':>7}"]
+            lines += [f"{name:<11}{p50:7.2f}{p99:7.2f}" for name, p50, p99 in self.percentiles()]
+            line_height = font.get_linesize()
+            rendered = [font.render(line, True, (255, 255, 255)) for line in lines]
+            self.overlay = pg.Surface((max(surface.get_width() for surface in rendered) + 8,
+                                       line_height * len(rendered) + 8))
+            self.overlay.fill((0, 0, 0))
+            for i, surface in enumerate(rendered):
+                self.overlay.blit(surface, (4, 4 + i * line_height))
+            self.overlay_time = now
+        return screen.blit(self.overlay, position)
+
+    def dump_csv(self, path=None):
+        """
+        Write the recorded frames to a CSV file, one row per frame in milliseconds.
+
+        :param path: File to write. Defaults to a timestamped name in the working directory.
+        :return: The path written.
+        """
+        if path is None:
+            path = time.strftime("profile_%Y%m%d_%H%M%S.csv")
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(('frame',) + PHASES + ('total',))
+            for i, row in enumerate(self.recorded() * 1000):
+                writer.writerow([i] + [f"{value:.4f}" for value in row] + [f"{row.sum():.4f}"])
+        return path
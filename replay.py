@@ -0,0 +1,181 @@
+#############################################################
+# Module Name: Sugar Pop Replay Module
+# Project: Sugar Pop Program
+# Date: Oct 18, 2026
+# By: Eyasu Smieja
+# Description: Records game input to a binary log and replays it exactly
+#############################################################
+
+import bisect
+import struct
+import pygame as pg
+from settings import START_FLOW, LOAD_NEW_LEVEL, MAX_TIME_STEP, REPLAY_SNAPSHOT_INTERVAL
+
+# File header: magic, format version, RNG seed
+HEADER = struct.Struct('<4sHI')
+MAGIC = b'SPIL'
+VERSION = 2
+
+# One input: physics step it was handled before, kind, and two values (mouse x, y or a table index)
+RECORD = struct.Struct('<IBhh')
+
+# Input kinds
+MOUSE_DOWN, MOUSE_MOTION, MOUSE_UP, KEY, TIMER, KEY_UP = range(1, 7)
+
+# Keys and timer events that change the simulation, stored by index
+RECORDED_KEYS = (pg.K_r, pg.K_UP, pg.K_DOWN, pg.K_SPACE, pg.K_LEFT, pg.K_RIGHT)
+RECORDED_KEY_UPS = (pg.K_LEFT, pg.K_RIGHT)  # The moving bucket moves while these are held
+RECORDED_TIMERS = (START_FLOW, LOAD_NEW_LEVEL)
+
+
+def encode_event(event, mouse_down):
+    """
+    Return (kind, a, b) for an event that changes the simulation, or None.
+
+    :param event: The pygame event about to be handled.
+    :param mouse_down: Whether a line is being drawn. Mouse motion only matters then.
+    """
+    if event.type == pg.MOUSEBUTTONDOWN:
+        return (MOUSE_DOWN,) + tuple(event.pos)
+    if event.type == pg.MOUSEBUTTONUP:
+        return (MOUSE_UP,) + tuple(event.pos)
+    if event.type == pg.MOUSEMOTION and mouse_down:
+        return (MOUSE_MOTION,) + tuple(event.pos)
+    if event.type == pg.KEYDOWN and event.key in RECORDED_KEYS:
+        return KEY, RECORDED_KEYS.index(event.key), 0
+    if event.type == pg.KEYUP and event.key in RECORDED_KEY_UPS:
+        return KEY_UP, RECORDED_KEYS.index(event.key), 0
+    if event.type in RECORDED_TIMERS:
+        return TIMER, RECORDED_TIMERS.index(event.type), 0
+    return None
+
+
+def decode_event(kind, a, b):
+    """Rebuild the pygame event of an encoded input."""
+    if kind == MOUSE_DOWN:
+        return pg.event.Event(pg.MOUSEBUTTONDOWN, pos=(a, b), button=1)
+    if kind == MOUSE_UP:
+        return pg.event.Event(pg.MOUSEBUTTONUP, pos=(a, b), button=1)
+    if kind == MOUSE_MOTION:
+        return pg.event.Event(pg.MOUSEMOTION, pos=(a, b), rel=(0, 0), buttons=(1, 0, 0))
+    if kind == KEY:
+        return pg.event.Event(pg.KEYDOWN, key=RECORDED_KEYS[a])
+    if kind == KEY_UP:
+        return pg.event.Event(pg.KEYUP, key=RECORDED_KEYS[a])
+    return pg.event.Event(RECORDED_TIMERS[a])
+
+
+class InputRecorder:
+    def __init__(self, path, seed):
+        """
+        Write every simulation input, with the step it arrived at, to a binary log.
+
+        :param path: The log file to create.
+        :param seed: The game's RNG seed, stored in the header.
+        """
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed))
+
+    def record(self, step, event, mouse_down):
+        """
+        Log an event if it changes the simulation.
+
+        :param step: Index of the next physics step.
+        :param event: The pygame event about to be handled.
+        :param mouse_down: Whether a line is being drawn.
+        """
+        encoded = encode_event(event, mouse_down)
+        if encoded:
+            self.file.write(RECORD.pack(step, *encoded))
+
+    def close(self):
+        """Finish the log."""
+        self.file.close()
+
+
+def read_log(path):
+    """
+    Read an input log.
+
+    :param path: The log file.
+    :return: (seed, list of (step, pygame event)).
+    :raises ValueError: If the file is not an input log.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, seed = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} Sugar Pop input log")
+    body = data[HEADER.size:]
+    body = body[:len(body) - len(body) % RECORD.size]  # Drop a record cut short by a crash
+    inputs = [(step, decode_event(kind, a, b)) for step, kind, a, b in RECORD.iter_unpack(body)]
+    return seed, inputs
+
+
+class ReplayPlayer:
+    def __init__(self, game, inputs, snapshot_interval=REPLAY_SNAPSHOT_INTERVAL):
+        """
+        Re-run recorded inputs on a game as fast as possible. The game's own
+        timers are off, the recorded timer events drive it instead.
+        The game keyframes every snapshot_interval steps (see Game.keyframe())
+        and the snapshots are kept, so seek() can go back without starting over.
+
+        :param game: A headless Game created with the log's seed.
+        :param inputs: (step, event) list from read_log().
+        :param snapshot_interval: Steps between snapshots. Must match the
+            recording's REPLAY_SNAPSHOT_INTERVAL to replay it exactly.
+        """
+        self.game = game
+        self.inputs = inputs
+        self.snapshot_interval = snapshot_interval
+        self.next_input = 0
+        self.snapshots = {}  # Step -> (next input, game state)
+        self.at_keyframe = False  # The game was just restored from a snapshot
+        game.timers_enabled = False
+
+    @property
+    def step(self):
+        """The index of the next step to simulate."""
+        return self.game.step_count
+
+    def run_to(self, target):
+        """
+        Simulate forward until target steps have run.
+
+        :param target: Step index to stop at.
+        """
+        game = self.game
+        while game.step_count < target:
+            while self.next_input < len(self.inputs) and self.inputs[self.next_input][0] <= game.step_count:
+                game.handle_event(self.inputs[self.next_input][1])
+                self.next_input += 1
+            # Keyframe after the step's inputs and before its physics, like a recording game.
+            # A keyframe seen before is restored, so every pass carries on from the same copy.
+            if game.step_count % self.snapshot_interval == 0 and not self.at_keyframe:
+                if game.step_count in self.snapshots:
+                    game.restore_state(self.snapshots[game.step_count][1])
+                else:
+                    self.snapshots[game.step_count] = (self.next_input, game.keyframe())
+            game.step(MAX_TIME_STEP)
+            self.at_keyframe = False
+
+    def seek(self, target):
+        """
+        Jump to a step, from the nearest snapshot at or before it.
+
+        :param target: Step index to go to.
+        """
+        steps = sorted(self.snapshots)
+        index = bisect.bisect_right(steps, target) - 1
+        # Restore unless simulating on from here is shorter. Every step
+        # already run has a snapshot at or before it, step 0 included.
+        if index >= 0 and (target < self.game.step_count or steps[index] > self.game.step_count):
+            self.next_input, state = self.snapshots[steps[index]]
+            self.game.restore_state(state)
+            self.at_keyframe = True
+        self.run_to(target)
+
+    def run_to_end(self):
+        """Simulate until the last recorded input has been handled."""
+        if self.inputs:
+            self.run_to(self.inputs[-1][0] + 1)
@@ -10,19 +10,56 @@ import pygame as pg
 
 # Window settings
 RES = WIDTH, HEIGHT = 1024, 800
-FPS = 120
+FPS = 120  # Target render frame rate
 
 # Scaling factor (Pixels per meter)
 SCALE = 30  # Scale Factor: 30 pixels per meter
-MAX_TIME_STEP = 1.0 / FPS  # Simulation step
+
+# Physics runs at its own fixed rate, independent of the render frame rate
+PHYSICS_FPS = 120
+MAX_TIME_STEP = 1.0 / PHYSICS_FPS  # Fixed simulation step
+MAX_SUBSTEPS = 8  # Most physics steps run to catch up after one slow frame
+PHYSICS_THREAD = False  # Step physics on its own thread, overlapping with drawing
+
+# Grains slower than IDLE_SPEED_THRESHOLD (Pymunk units/s, here 2 px/s, about a grain
+# per second) for SLEEP_TIME_THRESHOLD seconds fall asleep and cost the solver nothing
+SLEEP_TIME_THRESHOLD = 0.5
+IDLE_SPEED_THRESHOLD = 2 / SCALE
+
+# Steps between keyframes, the game snapshots a replay seeks from. A recording game keyframes too.
+REPLAY_SNAPSHOT_INTERVAL = 600
+
+# Only push the screen regions that changed to the display
+DIRTY_RECTS = True
+DIRTY_TILE_SIZE = 32  # Grain changes are tracked per square tile of this many pixels
+
+# User-drawn lines: points closer than this many pixels to a straight run are merged into it,
+# and a level allows this many segments in all unless its JSON sets "line_segment_budget"
+LINE_SIMPLIFY_TOLERANCE = 2
+LINE_SEGMENT_BUDGET = 100
+
+# Most grains parked for reuse between levels
+GRAIN_POOL_CAPACITY = 5000
+
+# Number of rendered text surfaces kept by text_cache
+TEXT_CACHE_SIZE = 128
+
+# Frames kept by the frame profiler (F3 toggles it, F4 writes a CSV)
+PROFILER_FRAMES = 600
+
+# Milliseconds between window caption (fps) updates
+CAPTION_INTERVAL = 500
 
 # Define collision types
 FLOOR_COLLISION_TYPE = 1
-BOX_COLLISION_TYPE = 2
+BOX_COLLISION_TYPE = 2  # Bucket interior sensors
+GRAIN_COLLISION_TYPE = 3
+TELEPORT_COLLISION_TYPE = 4  # Teleport zone entry sensors
 
 
 # Level Info
 LEVEL_FILE_NAME = './levels/levelX.json'
+LEVEL_CACHE_DIR = './levels/.cache'  # Compiled levels, rebuilt whenever the JSON changes
 
 # User Defined Events
 START_FLOW = pg.USEREVENT + 1
@@ -11,7 +11,7 @@ import pymunk
 from settings import SCALE, HEIGHT
 
 class StaticItem:
-    def __init__(self, space, x1, y1, x2, y2, color='gray', line_width=3, friction=0.3, elasticity=0.5):
+    def __init__(self, space, x1, y1, x2, y2, color='gray', line_width=3, friction=0.3, elasticity=0.5, attach=True):
         """
         Initialize a static line segment in Pymunk between two points (x1, y1) and (x2, y2).
         
@@ -22,6 +22,8 @@ class StaticItem:
         :param line_width: Width of the line for rendering in Pygame.
         :param friction: Friction coefficient of the line segment.
         :param elasticity: Elasticity (bounciness) of the line segment.
+        :param attach: Add the segment to the space now. Pass False to build it
+            off the main thread and call attach() later.
         """
         self.color = color
         self.line_width = line_width
@@ -39,7 +41,15 @@ class StaticItem:
         self.segment.friction = friction
         self.segment.elasticity = elasticity
 
-        # Add the segment to the Pymunk space
+        # The segment never moves, so its screen coordinates are worked out once
+        self.start = (x1, HEIGHT - y1)
+        self.end = (x2, HEIGHT - y2)
+
+        if attach:
+            self.attach()
+
+    def attach(self):
+        """Add the segment to the Pymunk space."""
         self.space.add(self.segment)
 
     def draw(self, screen):
@@ -48,16 +58,7 @@ class StaticItem:
         
         :param screen: The Pygame screen to draw the line on.
         """
-        # Convert Pymunk coordinates to Pygame screen coordinates for rendering
-        start_x = self.segment.a[0] * SCALE
-        start_y = HEIGHT - self.segment.a[1] * SCALE
-        end_x = self.segment.b[0] * SCALE
-        end_y = HEIGHT - self.segment.b[1] * SCALE
-        start = (start_x, start_y)
-        end = (end_x, end_y)
-
-        # Draw the line
-        pg.draw.line(screen, pg.Color(self.color), start, end, self.line_width)
+        pg.draw.line(screen, pg.Color(self.color), self.start, self.end, self.line_width)
 
     def delete(self):
         """
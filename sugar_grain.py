@@ -6,19 +6,21 @@
 # Description: The sugar grain implementation of the sugar pop game
 ##############################################################
 
-import pygame as pg
 import pymunk
-from settings import SCALE, HEIGHT
-import random 
+from settings import SCALE, GRAIN_COLLISION_TYPE
 
 class Sugar_Grain:
-    def __init__(self, space, x, y, friction=0.3, teleport_point_1=(296, 0), teleport_point_2=(376, 0), teleport_target=(900, 800)):
+    # Grains exist by the thousand, so no per-instance __dict__
+    __slots__ = ('space', 'body', 'shape')
+
+    def __init__(self, space, x, y, friction=0.3):
         """
         Initialize a sugar grain as a small dynamic body in Pymunk.
         
         :param space: The Pymunk space where the grain will be created.
         :param x: Initial x position in Pygame coordinates.
         :param y: Initial y position in Pygame coordinates.
+        :param friction: Friction of the grain.
         """
         self.space = space
 
@@ -43,52 +45,23 @@ class Sugar_Grain:
 
         # Add the body and shape to the space
         self.space.add(self.body, self.shape)
-        self.shape.collision_type = 2
-
-        self.teleporting = False
-        self.teleport_point_1 = teleport_point_1  # First teleportation point
-        self.teleport_point_2 = teleport_point_2  # Second teleportation point
-        self.teleport_target =  teleport_target  # Final teleport target
-
-    def teleport(self, x, y):
-        """Teleports the sugar grain to a new position."""
-        self.body.position = (x / SCALE, y / SCALE)
+        self.shape.collision_type = GRAIN_COLLISION_TYPE
+        self.shape.grain = self  # Lets collision callbacks find the grain from its shape
 
-    def check_teleport(self):
-        """Check if the sugar grain reaches teleportation points."""
-        # Check if it reaches the second teleportation point
-        if not self.teleporting and (abs(self.body.position.x * SCALE - self.teleport_point_2[0]) < 5 and
-                                     abs(self.body.position.y * SCALE - self.teleport_point_2[1]) < 5):
-            self.teleporting = True
-            # Teleport to the final destination
-            self.teleport(random.randint(900, 990), 800)
-        elif not self.teleporting and (abs(self.body.position.x * SCALE - self.teleport_point_1[0]) < 5 and
-                                       abs(self.body.position.y * SCALE - self.teleport_point_1[1]) < 5):
-            self.teleporting = True
-            # Teleport to the final destination
-            self.teleport(random.randint(900, 990), 800)
-
-
-    def update(self):
-        """
-        Update method for sugar_grain.
-        This checks if the grain reaches teleportation points and teleports it.
+    def reset(self, x, y, friction=0.3):
         """
-        self.check_teleport()
+        Bring a parked grain back into play, at rest, as if newly created.
 
-    def draw(self, screen):
+        :param x: New x position in Pygame coordinates.
+        :param y: New y position in Pygame coordinates.
+        :param friction: Friction of the grain.
         """
-        Draw the sugar grain on the Pygame screen.
-        
-        :param screen: The Pygame surface to draw the grain on.
-        """
-        # Get the position of the grain in Pygame coordinates
-        pos = self.body.position
-        screen_x = pos.x * SCALE
-        screen_y = HEIGHT - pos.y * SCALE
-
-        # Draw a small square at this position
-        pg.draw.rect(screen, pg.Color('white'), (screen_x - 1, screen_y - 1, 2, 2))
+        self.body.position = x / SCALE, y / SCALE
+        self.body.velocity = (0, 0)
+        self.body.angle = 0
+        self.body.angular_velocity = 0
+        self.shape.friction = friction
+        self.space.add(self.body, self.shape)
 
     def delete(self):
         """
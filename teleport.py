@@ -0,0 +1,148 @@
+#############################################################
+# Module Name: Sugar Pop Teleport Module
+# Project: Sugar Pop Program
+# Date: Oct 18, 2026
+# By: Eyasu Smieja
+# Description: Teleportation zones of the sugar pop game
+#############################################################
+
+from collections import Counter
+import pygame as pg
+import pymunk
+from settings import SCALE, HEIGHT, TELEPORT_COLLISION_TYPE, GRAIN_COLLISION_TYPE
+from collisions import on_collision, ordered_shapes
+
+# Radius used when a level leaves one out, in Pygame units
+DEFAULT_ZONE_RADIUS = 15
+
+
+class TeleportZone:
+    def __init__(self, space, entry, exit, entry_radius=DEFAULT_ZONE_RADIUS, exit_radius=DEFAULT_ZONE_RADIUS, attach=True):
+        """
+        A circular entry area that sends grains to an exit area.
+
+        :param space: The Pymunk space to add the entry sensor to.
+        :param entry: (x, y) center of the entry in Pygame units.
+        :param exit: (x, y) center of the exit in Pygame units.
+        :param entry_radius: Radius of the entry in Pygame units.
+        :param exit_radius: Grains land up to this far left or right of the exit, in Pygame units.
+        :param attach: Add the sensor to the space now. Pass False to build the
+            zone off the main thread and call attach() later.
+        """
+        self.space = space
+        self.entry = tuple(entry)
+        self.exit = tuple(exit)
+        self.entry_radius = entry_radius
+        self.exit_radius = exit_radius
+
+        # Sensor over the entry, grains touching it are reported by the collision handler
+        self.sensor = pymunk.Circle(space.static_body, entry_radius / SCALE, (entry[0] / SCALE, entry[1] / SCALE))
+        self.sensor.sensor = True  # Reports overlaps but never pushes grains
+        self.sensor.collision_type = TELEPORT_COLLISION_TYPE
+        self.sensor.zone = self
+        if attach:
+            self.attach()
+
+    def attach(self):
+        """Add the entry sensor to the space."""
+        self.space.add(self.sensor)
+
+    def landing_point(self, rng):
+        """
+        Return a random landing point around the exit, in Pymunk units.
+
+        :param rng: The game's random.Random, so replays land grains in the same spots.
+        """
+        exit_x, exit_y = self.exit
+        x = exit_x + rng.uniform(-self.exit_radius, self.exit_radius)
+        return x / SCALE, exit_y / SCALE
+
+    def draw(self, screen):
+        """
+        Draw the entry circle in blue and the exit circle in pink.
+
+        :param screen: The Pygame surface to draw on.
+        """
+        entry_x, entry_y = self.entry
+        exit_x, exit_y = self.exit
+        pg.draw.circle(screen, pg.Color('blue'), (entry_x, HEIGHT - entry_y), self.entry_radius)
+        pg.draw.circle(screen, pg.Color('pink'), (exit_x, HEIGHT - exit_y), self.exit_radius)
+
+    def delete(self):
+        """Remove the entry sensor from the space."""
+        self.space.remove(self.sensor)
+
+
+class TeleportSystem:
+    def __init__(self, space, rng):
+        """
+        Own the teleport zones of the current level. Grains entering a zone
+        are queued by a sensor callback and moved after the physics step,
+        so the work per step only grows with the grains that hit a zone.
+        A grain teleports at most once per level.
+
+        :param space: The Pymunk space the zones and grains live in.
+        :param rng: random.Random used for landing points.
+        """
+        self.space = space
+        self.rng = rng
+        self.zones = []
+        self.pending = {}  # Grain -> zone it entered during the current step
+        self.teleported = set()  # Grains already teleported this level, zones ignore them
+        self.hits = Counter()  # Zone index -> grains teleported this level
+        on_collision(space, GRAIN_COLLISION_TYPE, TELEPORT_COLLISION_TYPE,
+                     begin=_grain_entered_zone, data=self)
+
+    def load(self, zones):
+        """
+        Replace the zones with the ones of a level.
+
+        :param zones: Unattached TeleportZones, from build_zones().
+        """
+        self.clear()
+        for zone in zones:
+            zone.attach()
+        self.zones = list(zones)
+
+    def clear(self):
+        """Remove every zone and reset the hit counts."""
+        for zone in self.zones:
+            zone.delete()
+        self.zones = []
+        self.pending = {}
+        self.teleported = set()
+        self.hits.clear()
+
+    def process(self):
+        """Move the grains that entered a zone during the last step. Call after space.step()."""
+        for grain, zone in self.pending.items():
+            body = grain.body
+            body.position = zone.landing_point(self.rng)
+            body.velocity = (0, 0)  # Reset motion
+            self.space.reindex_shapes_for_body(body)
+            self.hits[self.zones.index(zone)] += 1
+            self.teleported.add(grain)
+        self.pending.clear()
+
+    def total_hits(self):
+        """Return how many grains were teleported this level."""
+        return sum(self.hits.values())
+
+
+def build_zones(space, teleportations):
+    """
+    Build the zones of a level without adding them to the space.
+
+    :param space: The Pymunk space the zones will be added to.
+    :param teleportations: (entry, exit, entry_radius, exit_radius) tuples,
+        the compiled level's 'teleportations' (see level.compile_level()).
+    :return: List of unattached TeleportZones.
+    """
+    return [TeleportZone(space, entry, exit, entry_radius, exit_radius, attach=False)
+            for entry, exit, entry_radius, exit_radius in teleportations]
+
+
+def _grain_entered_zone(arbiter, space, teleports):
+    grain_shape, sensor = ordered_shapes(arbiter, GRAIN_COLLISION_TYPE)
+    if grain_shape.grain not in teleports.teleported:
+        teleports.pending[grain_shape.grain] = sensor.zone
@@ -0,0 +1,43 @@
+#############################################################
+# Module Name: Sugar Pop Keyframe Tests
+# Project: Sugar Pop Program
+# Date: Oct 18, 2026
+# By: Eyasu Smieja
+# Description: Checks that a game restored from a keyframe keeps playing
+#############################################################
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.chdir(os.path.dirname(os.path.abspath(__file__)))  # Levels are found relative to the game folder
+
+import pygame as pg
+import main
+from settings import MAX_TIME_STEP
+
+
+def test_bucket_explodes_on_the_step_after_a_keyframe():
+    game = main.Game(headless=True, seed=1)
+    try:
+        game.current_level = 0
+        game.handle_event(pg.event.Event(main.LOAD_NEW_LEVEL))
+        bucket = game.buckets[0]
+        bucket.needed_sugar = 2
+
+        # One grain in the bucket, then a second one just above it
+        game.sugar_grains.spawn(bucket.bucketx, bucket.buckety + 10)
+        for _ in range(60):
+            game.step(MAX_TIME_STEP)
+        assert bucket.count == 1
+        game.sugar_grains.spawn(bucket.bucketx, bucket.buckety + 16)
+
+        # The explosion happens inside a collision callback, where errors are only printed
+        for _ in range(120):
+            game.keyframe()
+            game.step(MAX_TIME_STEP)
+            if not game.buckets:
+                break
+        assert game.buckets == []
+    finally:
+        game.close()
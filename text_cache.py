@@ -0,0 +1,58 @@
+#############################################################
+# Module Name: Sugar Pop Text Cache Module
+# Project: Sugar Pop Program
+# Date: Oct 18, 2026
+# By: Eyasu Smieja
+# Description: Cache of rendered text surfaces for the sugar pop game
+#############################################################
+
+from collections import OrderedDict
+from settings import TEXT_CACHE_SIZE
+
+
+class TextCache:
+    def __init__(self, max_size=TEXT_CACHE_SIZE):
+        """
+        Keep recently rendered text surfaces so text that does not change
+        is rasterized once instead of every frame.
+
+        :param max_size: Number of surfaces kept. The least recently used is dropped first.
+        """
+        self.max_size = max_size
+        self.surfaces = OrderedDict()  # (font, text, color, antialias) -> Surface
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        """
+        Return the rendered surface for text, rendering it only on a cache miss.
+        The surface is shared, so callers must not draw on it.
+
+        :param font: The pg.font.Font to render with.
+        :param text: The string to render.
+        :param color: The text color.
+        :param antialias: Whether to antialias the text.
+        """
+        key = (font, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)  # Most recently used goes last
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)  # Drop the least recently used
+        return surface
+
+    def clear(self):
+        """Drop every cached surface and reset the counters."""
+        self.surfaces.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Shared by the heads-up display and the message display
+text_cache = TextCache()